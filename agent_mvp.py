@@ -1,81 +1,178 @@
 """Enhanced InterviewerAgent with user profile, scoring, and info collection"""
 
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import StrOutputParser
+import time
+import logging
 import config_mvp as config
+from memory_mvp import estimate_tokens
+from llm_gateway_mvp import LLMGateway
+from llm_providers_mvp import create_llm
+from telemetry_mvp import span
+from scoring_mvp import AnswerScorer, overall_score
+from semantic_cache_mvp import SemanticCache, question_context, personal_terms, is_shareable
+from summary_mvp import InterviewSummary, SummaryFormatError, SUMMARY_SCHEMA, parse_partial_summary, parse_summary
 
-class InterviewerAgent:
-    def __init__(self, domain: str, google_api_key: str):
-        self.domain = domain
-        self.domain_info = config.DOMAIN_TEMPLATES[domain]
-        self.user_profiles = {}  # Store profiles keyed by user ID or session
-        self.scores = {}  # Store scores keyed by user ID or session
-        self.responses = {}  # Store responses keyed by user ID or session
-
-        self.llm = ChatGoogleGenerativeAI(
-            model=config.GEMINI_MODEL,
-            google_api_key=google_api_key,
-            temperature=0.7
-        )
 
-        self.chain = self._create_chain()
-
-    def _create_chain(self):
-        """Create the interview chain with persona"""
-        template = """{persona}
-        You are asking question #{question_number} out of {total_questions}.
-        Interview context so far:
-        {conversation_history}
-        Your next question from the template: "{question}"
-        Ask this question in a conversational way and wait for the candidate's response.
-        Make it sound natural, not robotic. Add a bit of context or follow-up if relevant."""
-        prompt = ChatPromptTemplate.from_template(template)
-        chain = prompt | self.llm | StrOutputParser()
-        return chain
-
-    def initialize_user(self, user_id: str):
-        """Initialize profile, responses, and score for a new user session"""
-        self.user_profiles[user_id] = {}
-        self.responses[user_id] = []
-        self.scores[user_id] = 0
-
-    def update_user_profile(self, user_id: str, profile_data: dict):
-        """Update user profile with new data"""
-        if user_id not in self.user_profiles:
-            self.initialize_user(user_id)
-        self.user_profiles[user_id].update(profile_data)
+class UserSession:
+    """Per-candidate state (profile, responses, score), kept in the session rather than in the shared agent"""
 
-    def get_user_profile(self, user_id: str):
-        """Retrieve user profile"""
-        return self.user_profiles.get(user_id, {})
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.profile = {}
+        self.responses = []
+        self.score = 0  # local rubric score 0-100 (see scoring_mvp), filled in before the summary
+        self.answer_scores = []  # AnswerScore.to_dict() per answer
+        self.prompt_token_counts = []  # estimated prompt tokens, one entry per foreground LLM call
 
-    def record_response(self, user_id: str, question: str, answer: str):
-        """Record user's answer and update responses"""
-        if user_id not in self.responses:
-            self.initialize_user(user_id)
-        self.responses[user_id].append({'question': question, 'answer': answer})
+    def record_prompt(self, prompt: str):
+        self.prompt_token_counts.append(estimate_tokens(prompt))
 
-    def score_response(self, user_id: str, answer: str):
-        """Simple scoring logic based on answer content (placeholder)"""
-        # Placeholder: increase score if answer contains certain keywords
-        score_increment = 1 if len(answer) > 0 else 0
-        self.scores[user_id] = self.scores.get(user_id, 0) + score_increment
+    def update_profile(self, profile_data: dict):
+        """Update user profile with new data"""
+        self.profile.update(profile_data)
+
+    def record_response(self, question: str, answer: str):
+        """Record user's answer and update responses"""
+        self.responses.append({'question': question, 'answer': answer})
 
-    def get_user_score(self, user_id: str):
-        """Retrieve user's total score"""
-        return self.scores.get(user_id, 0)
+    def apply_scores(self, answer_scores: list):
+        """Store the local rubric scores of all answers (list of AnswerScore)"""
+        self.answer_scores = [score.to_dict() for score in answer_scores]
+        self.score = overall_score(answer_scores)
 
-    def collect_user_info(self, user_id: str, info: dict):
+    def collect_info(self, info: dict):
         """Collect additional user info"""
-        self.update_user_profile(user_id, info)
+        self.update_profile(info)
+
+    def to_dict(self) -> dict:
+        return {
+            'user_id': self.user_id,
+            'profile': self.profile,
+            'responses': self.responses,
+            'score': self.score,
+            'answer_scores': self.answer_scores,
+            'prompt_token_counts': self.prompt_token_counts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        session = cls(data['user_id'])
+        session.profile = dict(data.get('profile', {}))
+        session.responses = list(data.get('responses', []))
+        session.score = data.get('score', 0)
+        session.answer_scores = list(data.get('answer_scores', []))
+        session.prompt_token_counts = list(data.get('prompt_token_counts', []))
+        return session
+
 
-    def generate_question(self, user_id: str, question_num: int, conversation: str, resume_text: str = "", jobdesc_text: str = "") -> str:
+def _token_counts(prompt: str, text: str, usage: dict) -> dict:
+    """Span attributes for a call: the provider's token usage, or chars / 4 estimates (the stub) flagged as such"""
+    if usage:
+        return {"prompt_tokens": usage.get("input_tokens", 0), "completion_tokens": usage.get("output_tokens", 0),
+                "tokens_estimated": False}
+    return {"prompt_tokens": estimate_tokens(prompt), "completion_tokens": estimate_tokens(text), "tokens_estimated": True}
+
+
+class InterviewerAgent:
+    """Stateless per-domain interviewer; safe to share across sessions"""
+
+    def __init__(self, domain: str, google_api_key: str = "", llm=None, gateway: LLMGateway = None,
+                 scorer: AnswerScorer = None, semantic_cache: SemanticCache = None, question_bank=None):
+        self.domain = domain
+        self.domain_info = config.DOMAIN_TEMPLATES[domain]
+        if gateway is None:
+            gateway = LLMGateway(llm if llm is not None else create_llm(google_api_key))
+        self.gateway = gateway
+        self.scorer = scorer or AnswerScorer()  # lexical signals only unless given an encoder
+        self.semantic_cache = semantic_cache  # optional, shared across candidates
+        self.question_bank = question_bank  # optional QuestionBank replacing the fixed template questions
+
+    def _invoke(self, stage: str, session: UserSession, prompt: str, record: bool = True) -> str:
         """
-        Generate the next interview question, building on user's responses, resume, and job description.
-        The agent can choose to use a template question or generate a dynamic follow-up.
+        One timed LLM call, with the token usage the provider reports (see _token_counts). Background calls
+        (speculation, assessments) pass record=False so they don't show up as the candidate's last prompt.
+        """
+        if record:
+            session.record_prompt(prompt)
+        with span(stage, domain=self.domain, prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt),
+                  tokens_estimated=True) as call:
+            usage = {}
+            text = self.gateway.invoke(prompt, usage)
+            call.set(**_token_counts(prompt, text, usage))
+        return text
+
+    def _stream(self, stage: str, session: UserSession, prompt: str, record: bool = True):
+        """Streaming variant of _invoke; the span also records time to first chunk"""
+        if record:
+            session.record_prompt(prompt)
+        with span(stage, domain=self.domain, prompt_chars=len(prompt), prompt_tokens=estimate_tokens(prompt),
+                  tokens_estimated=True, streamed=True) as call:
+            start = time.perf_counter()
+            usage = {}
+            text = ""
+            for chunk in self.gateway.stream(prompt, usage):
+                if not text:
+                    call.set(first_chunk_ms=round((time.perf_counter() - start) * 1000, 3))
+                text += chunk
+                yield chunk
+            call.set(**_token_counts(prompt, text, usage))
+
+    def template_question(self, question_num: int) -> str:
+        questions = self.domain_info["questions"]
+        return questions[question_num - 1] if question_num - 1 < len(questions) else ""
+
+    def select_template_question(self, session: UserSession, asked_ids: list, resume_text: str = "",
+                                 jobdesc_text: str = "", recent_answers: list = ()):
+        """
+        The unasked bank question closest to the candidate (resume/JD/profile and recent answers), or None
+        without a bank. The context texts go through the embedding cache, so after the first turn only the
+        newest answer is encoded; the nearest-neighbour search itself is a mat-vec over the memory map.
         """
-        user_profile = self.get_user_profile(user_id)
+        if self.question_bank is None:
+            return None
+        profile = session.profile
+        context = [resume_text[:1000], jobdesc_text[:1000],
+                   f"Background: {profile.get('background', '')} Goals: {profile.get('goals', '')}", *recent_answers]
+        with span("select_question", domain=self.domain, bank_size=len(self.question_bank)) as selection:
+            seniority = profile.get('seniority', '')
+            texts = [text for text in context if text and text.strip()]
+            if texts:
+                query = self.question_bank.embed(texts)
+                start = time.perf_counter()
+                question, similarity = self.question_bank.nearest(query, asked_ids, seniority)
+                selection.set(select_ms=round((time.perf_counter() - start) * 1000, 3))
+            else:
+                question, similarity = self.question_bank.select([], asked_ids, seniority)
+            selection.set(similarity=round(similarity, 4), found=question is not None)
+        return question
+
+    def _cached_question(self, session: UserSession, question_num: int, conversation: str, resume_text: str,
+                         jobdesc_text: str, context_passages: list, template_question: str = None):
+        """(cached question or None, context vector to store the new question under); (None, None) without a cache"""
+        if self.semantic_cache is None:
+            return None, None
+        if not context_passages:
+            context_passages = [{'text': resume_text[:250]}, {'text': jobdesc_text[:250]}]
+        with span("semantic_cache_lookup", domain=self.domain, question_num=question_num) as lookup:
+            if template_question is None:
+                template_question = self.template_question(question_num)
+            context = question_context(session, question_num, template_question, conversation, context_passages)
+            vector = self.semantic_cache.embed(context)
+            question, similarity = self.semantic_cache.lookup(self.domain, question_num, vector)
+            lookup.set(cache_hit=question is not None, similarity=round(similarity, 4))
+        return question, vector
+
+    def _store_question(self, session: UserSession, question_num: int, vector, question: str, resume_text: str,
+                        jobdesc_text: str, context_passages: list):
+        """Cache a generated question unless it is personal (names the candidate, their employers, ...)"""
+        if vector is None:
+            return
+        if is_shareable(question, personal_terms(session, resume_text, jobdesc_text, context_passages)):
+            self.semantic_cache.store(self.domain, question_num, vector, question)
+
+    def build_question_prompt(self, session: UserSession, question_num: int, conversation: str, resume_text: str = "", jobdesc_text: str = "",
+                              context_passages: list = None, template_question: str = None) -> str:
+        """Assemble the prompt for the next interview question"""
+        user_profile = session.profile
         profile_context = ""
         if user_profile:
             profile_context = (
@@ -83,10 +180,19 @@ class InterviewerAgent:
                 f"Background: {user_profile.get('background', '')}, "
                 f"Goals: {user_profile.get('goals', '')}.\n"
             )
-        resume_context = f"\nResume:\n{resume_text[:1000]}" if resume_text else ""
-        jobdesc_context = f"\nJob Description:\n{jobdesc_text[:1000]}" if jobdesc_text else ""
-        # Use the template question as a suggestion, but allow the LLM to build on the conversation
-        template_question = self.domain_info["questions"][question_num - 1] if question_num - 1 < len(self.domain_info["questions"]) else ""
+        if context_passages:
+            # Retrieved chunks relevant to this question replace the blind resume/JD truncation
+            # (nothing retrieved, e.g. the chunks expired: fall back to the truncation below)
+            labels = {"resume": "Resume", "jobdesc": "Job Description"}
+            passages = "\n".join(f"- [{labels.get(p['type'], p['type'])}] {p['text']}" for p in context_passages)
+            resume_context = f"\nRelevant excerpts from the candidate's resume and job description:\n{passages}"
+            jobdesc_context = ""
+        else:
+            resume_context = f"\nResume:\n{resume_text[:1000]}" if resume_text else ""
+            jobdesc_context = f"\nJob Description:\n{jobdesc_text[:1000]}" if jobdesc_text else ""
+        # Use the template (or selected bank) question as a suggestion, but allow the LLM to build on the conversation
+        if template_question is None:
+            template_question = self.template_question(question_num)
         dynamic_prompt = f"""{self.domain_info['persona']}
 {profile_context}{resume_context}{jobdesc_context}
 You are conducting an interview. Here is the conversation so far:
@@ -98,25 +204,134 @@ Based on the user's previous answers, resume, and job description, ask the next
 You may use the template question, rephrase it, or ask a follow-up that builds on the user's last answer.
 Make the interview feel natural and adaptive. Only output the next question, nothing else.
 """
-        response = self.llm.invoke(dynamic_prompt)
-        return response.content if hasattr(response, "content") else response
+        return dynamic_prompt
+
+    def generate_question(self, session: UserSession, question_num: int, conversation: str, resume_text: str = "", jobdesc_text: str = "",
+                          context_passages: list = None, template_question: str = None, speculative: bool = False) -> str:
+        """
+        Generate the next interview question, building on user's responses, resume, and job description.
+        The agent can choose to use a template question or generate a dynamic follow-up.
+        A speculative question (prefetched before the answer exists) is neither recorded on the
+        session nor stored in the semantic cache: its prompt carries a placeholder answer.
+        """
+        cached, vector = self._cached_question(session, question_num, conversation, resume_text, jobdesc_text, context_passages,
+                                               template_question)
+        if cached is not None:
+            return cached
+        dynamic_prompt = self.build_question_prompt(session, question_num, conversation, resume_text, jobdesc_text, context_passages,
+                                                    template_question)
+        question = self._invoke("generate_question", session, dynamic_prompt, record=not speculative)
+        if not speculative:
+            self._store_question(session, question_num, vector, question, resume_text, jobdesc_text, context_passages)
+        return question
+
+    def stream_question(self, session: UserSession, question_num: int, conversation: str, resume_text: str = "", jobdesc_text: str = "",
+                        context_passages: list = None, template_question: str = None):
+        """Same as generate_question, but yields text chunks as the model produces them"""
+        cached, vector = self._cached_question(session, question_num, conversation, resume_text, jobdesc_text, context_passages,
+                                               template_question)
+        if cached is not None:
+            yield cached
+            return
+        dynamic_prompt = self.build_question_prompt(session, question_num, conversation, resume_text, jobdesc_text, context_passages,
+                                                    template_question)
+        question = ""
+        for chunk in self._stream("generate_question", session, dynamic_prompt):
+            question += chunk
+            yield chunk
+        self._store_question(session, question_num, vector, question, resume_text, jobdesc_text, context_passages)
+
+    def score_answers(self, session: UserSession, all_qa: list):
+        """Local rubric scores for every answer (one encode batch, no LLM call)"""
+        with span("score_answers", domain=self.domain, answers=len(all_qa)):
+            session.apply_scores(self.scorer.score_session(self.domain, all_qa))
 
-    def generate_summary(self, user_id: str, all_qa: list) -> str:
-        """Generate interview summary and include user profile info"""
+    def build_assessment_prompt(self, question: str, answer: str) -> str:
+        """Prompt for the short per-answer assessment (the map step of the summary)"""
+        return f"""You are assessing one answer from a {self.domain_info['name']} interview.
+Question: {question}
+Answer: {answer}
+In at most 60 words, write one line of strengths, one line of gaps, and end with "Answer score: N/10"."""
+
+    def assess_answer(self, session: UserSession, question: str, answer: str) -> str:
+        """Compact assessment of a single answer; runs in the background while the interview goes on"""
+        return self._invoke("assess_answer", session, self.build_assessment_prompt(question, answer), record=False).strip()
+
+    def build_summary_prompt(self, session: UserSession, all_qa: list, assessments: list = None) -> str:
+        """
+        Assemble the end-of-interview summary prompt (the reply is JSON matching SUMMARY_SCHEMA).
+        With `assessments` (one per answer, None where missing) the prompt reduces those short
+        assessments instead of re-reading every full answer.
+        """
+        rubric = session.answer_scores if len(session.answer_scores) == len(all_qa) else []
+        assessments = assessments if assessments is not None and len(assessments) == len(all_qa) else [None] * len(all_qa)
         qa_text = "\n\n".join([
-            f"Q: {item['q']}\nA: {item['a']}"
-            for item in all_qa
+            f"Q: {item['q']}\n" + (f"Assessment: {assessments[i]}" if assessments[i] else f"A: {item['a']}")
+            + (f"\nRubric: {self._rubric_line(rubric[i])}" if rubric else "")
+            for i, item in enumerate(all_qa)
         ])
-        summary_prompt = f"""Based on this {self.domain_info['name']} interview, provide a concise professional summary:
+        source = "these per-answer assessments of this" if any(assessments) else "this"
+        summary_prompt = f"""Based on {source} {self.domain_info['name']} interview, provide a concise professional summary:
 {qa_text}
-Generate a personal bulletted, organized summary with:
+Generate a personal, organized summary with:
 1. Overall Assessment (2-3 sentences)
 2. Key Strengths (3-4 bullet points)
 3. Areas for Development (2-3 bullet points)
 4. Pitfalls (and websites/sources/links to study from, for better performance)
 5. Recommendation (Hire/Prepare and try again/Maybe with brief reason)
 and give an interview score out of 100
-User Profile: {self.get_user_profile(user_id)}
-User Score: {self.get_user_score(user_id)}"""
-        summary = self.llm.invoke(summary_prompt)
-        return summary.content
\ No newline at end of file
+User Profile: {session.profile}
+User Score (local rubric, 0-100, use it as a signal but judge the answers yourself): {session.score}
+
+Respond with only a JSON object, no markdown fences, in exactly this shape:
+{SUMMARY_SCHEMA}"""
+        return summary_prompt
+
+    @staticmethod
+    def _rubric_line(score: dict) -> str:
+        signals = ", ".join(
+            f"{name} {score[name]:.2f}" for name in ("relevance", "reference", "keywords", "length", "structure")
+            if score.get(name) is not None
+        )
+        return f"{score['score']}/100 ({signals}; {score['words']} words)"
+
+    def build_repair_prompt(self, reply: str, error: SummaryFormatError) -> str:
+        """Ask the model to fix an invalid summary reply instead of regenerating the whole assessment"""
+        return f"""This interview summary reply is not valid: {error}
+Rewrite it as a single JSON object in exactly this shape, keeping its content. Output only the JSON.
+{SUMMARY_SCHEMA}
+
+Reply to fix:
+{reply}"""
+
+    def finish_summary(self, session: UserSession, reply: str) -> InterviewSummary:
+        """Validate the reply, with at most one repair call; shows the raw text if that still fails"""
+        try:
+            return parse_summary(reply)
+        except SummaryFormatError as e:
+            logging.warning(f"Summary reply didn't match the schema ({e}), asking for a repair")
+            repaired = self._invoke("repair_summary", session, self.build_repair_prompt(reply, e))
+        try:
+            return parse_summary(repaired)
+        except SummaryFormatError as e:
+            logging.warning(f"Repaired summary is still invalid ({e}), showing the raw reply")
+            return InterviewSummary.from_text(reply)
+
+    def generate_summary(self, session: UserSession, all_qa: list, assessments: list = None) -> InterviewSummary:
+        """Generate the structured interview summary (sections + numeric score)"""
+        self.score_answers(session, all_qa)
+        summary_prompt = self.build_summary_prompt(session, all_qa, assessments)
+        return self.finish_summary(session, self._invoke("generate_summary", session, summary_prompt))
+
+    def stream_summary(self, session: UserSession, all_qa: list, assessments: list = None):
+        """Same as generate_summary, but yields partial InterviewSummary snapshots as the JSON streams in;
+        the last one yielded is the validated result"""
+        self.score_answers(session, all_qa)
+        summary_prompt = self.build_summary_prompt(session, all_qa, assessments)
+        reply = ""
+        for chunk in self._stream("generate_summary", session, summary_prompt):
+            reply += chunk
+            partial = parse_partial_summary(reply)
+            if partial is not None:
+                yield partial
+        yield self.finish_summary(session, reply)
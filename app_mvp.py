@@ -3,15 +3,17 @@ Simple Interview Chatbot - MVP
 """
 import streamlit as st
 
-import os
-import tempfile
-import sys
-import chromadb
-from agent_mvp import InterviewerAgent
-import pdfplumber
+import json
+import base64
+import time
+from extraction_mvp import ExtractionError, extract_text_from_file
+from llm_gateway_mvp import LLMGatewayError
 import logging
+import config_mvp as config
+from telemetry_mvp import MemorySink, span, start_metrics_server, telemetry
 
-logging.basicConfig(level=logging.DEBUG)
+# Stage timings go to the telemetry sinks; DEBUG logging only buried them in library noise
+logging.basicConfig(level=config.LOG_LEVEL)
 
 # Page config
 st.set_page_config(page_title="Interview.io", page_icon="🎤", layout="wide")
@@ -84,80 +86,141 @@ st.markdown("""
 """, unsafe_allow_html=True)
 
 
-try:
-    """importing transformer library"""
-    from sentence_transformers import SentenceTransformer
-    logging.debug("SentenceTransformer imported successfully")
-except ImportError as e:
-    logging.error(f"ImportError: {e}")
-print(f"Python interpreter used: {sys.executable}")
-import config_mvp as config
-
-# Utility: Extract text from PDF or TXT file
-def extract_text_from_file(uploaded_file):
-    if uploaded_file is None:
-        return ""
-    if uploaded_file.type == "application/pdf":
-        with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp:
-            tmp.write(uploaded_file.read())
-            tmp_path = tmp.name
-        with pdfplumber.open(tmp_path) as pdf:
-            text = "\n".join(page.extract_text() or "" for page in pdf.pages)
-        os.remove(tmp_path)
-        return text
-    elif uploaded_file.type == "text/plain":
-        return uploaded_file.read().decode("utf-8")
-    else:
+# Only lightweight modules are imported here: torch/sentence-transformers, chromadb, pdfplumber and the
+# Gemini client load on first use (a domain click or upload), or in the WARM_UP_RESOURCES preload thread
+import resources_mvp as resources
+from prefetch_mvp import QuestionPrefetcher
+from assessment_mvp import AnswerAssessor
+from retrieval_mvp import build_documents, retrieve_passages
+from engine_mvp import InterviewSession
+
+DOMAIN_BUTTONS = {"engineering": "Engineering", "management": "Management", "hr": "HR"}
+
+if config.WARM_UP_RESOURCES:
+    resources.start_warm_up_thread()
+if config.METRICS_PORT:
+    start_metrics_server()
+
+# Utility: Extract text from PDF or TXT file (in memory, size-limited, cached by file hash)
+def safe_extract_text(uploaded_file):
+    try:
+        return extract_text_from_file(uploaded_file)
+    except ExtractionError as e:
+        # Shown on the interview page (the domain button reruns the script straight away)
+        st.session_state.upload_warnings = st.session_state.get('upload_warnings', []) + [f"{uploaded_file.name}: {e}"]
         return ""
 
-# Utility: Vectorize text
+# Utility: Vectorize text (one encoder per process, shared by all sessions through the batching service)
 def get_vectorizer():
-    if "vectorizer" not in st.session_state:
-        st.session_state.vectorizer = SentenceTransformer("all-MiniLM-L6-v2")
-    return st.session_state.vectorizer
+    return resources.get_embedder()
 
-# Utility: Initialize ChromaDB collection
+# Utility: ChromaDB collection (one client per process, shared by all sessions)
 def get_chromadb_collection():
-    if "chroma_client" not in st.session_state:
-        st.session_state.chroma_client = chromadb.Client()
-    if "chroma_collection" not in st.session_state:
-        st.session_state.chroma_collection = st.session_state.chroma_client.create_collection("user_docs")
-    return st.session_state.chroma_collection
+    return resources.get_collection()
 
 # Store uploaded files and user profile in ChromaDB
 def store_user_docs_and_vectors(user_id, resume_file, jobdesc_file, user_profile):
-    collection = get_chromadb_collection()
-    vectorizer = get_vectorizer()
-    # Extract text
-    resume_text = extract_text_from_file(resume_file)
-    jobdesc_text = extract_text_from_file(jobdesc_file)
-    profile_text = f"Name: {user_profile.get('name', '')}\nBackground: {user_profile.get('background', '')}\nGoals: {user_profile.get('goals', '')}"
-    # Vectorize
-    docs = []
-    metadatas = []
-    ids = []
-    if resume_text:
-        docs.append(resume_text)
-        metadatas.append({"type": "resume", "user_id": user_id})
-        ids.append(f"{user_id}_resume")
-    if jobdesc_text:
-        docs.append(jobdesc_text)
-        metadatas.append({"type": "jobdesc", "user_id": user_id})
-        ids.append(f"{user_id}_jobdesc")
-    if profile_text.strip():
-        docs.append(profile_text)
-        metadatas.append({"type": "profile", "user_id": user_id})
-        ids.append(f"{user_id}_profile")
-    if docs:
-        embeddings = vectorizer.encode(docs).tolist()
-        collection.upsert(
-            embeddings=embeddings,
-            documents=docs,
-            metadatas=metadatas,
-            ids=ids
-        )
+    with span("store_user_docs_and_vectors") as stage:
+        collection = get_chromadb_collection()
+        vectorizer = get_vectorizer()
+        # Extract text
+        resume_text = safe_extract_text(resume_file)
+        jobdesc_text = safe_extract_text(jobdesc_file)
+        profile_text = f"Name: {user_profile.get('name', '')}\nBackground: {user_profile.get('background', '')}\nGoals: {user_profile.get('goals', '')}"
+        # Chunk and vectorize (replacing any chunks from a previous upload)
+        docs, metadatas, ids = build_documents(user_id, resume_text, jobdesc_text, profile_text, last_seen=int(time.time()))
+        stage.set(chunks=len(docs), chars=sum(len(doc) for doc in docs))
+        collection.delete(where={"user_id": user_id})
+        if docs:
+            # Identical documents (re-uploads, domain switches, restarts) come from the cache
+            embedding_cache = resources.get_embedding_cache()
+            hits_before = embedding_cache.hits
+            embeddings = embedding_cache.encode(vectorizer, docs).tolist()
+            embedding_hits = embedding_cache.hits - hits_before
+            stage.set(embedding_cache_hits=embedding_hits, cache_hit=embedding_hits == len(docs))
+            collection.upsert(
+                embeddings=embeddings,
+                documents=docs,
+                metadatas=metadatas,
+                ids=ids
+            )
+        # Drop documents of candidates who have been gone longer than CANDIDATE_TTL_HOURS
+        resources.collect_stale_documents()
     return resume_text, jobdesc_text, profile_text
 
+# Retrieve the resume/JD passages most relevant to the upcoming question.
+# Only plain values go in, so it can also run on a prefetch thread.
+def retrieve_context(user_id, query):
+    # Every question is activity: keep this candidate's chunks from expiring (throttled)
+    resources.touch_candidate(user_id)
+    return retrieve_passages(get_chromadb_collection(), get_vectorizer(), user_id, query)
+
+# The interview engine owns every state transition; this script only renders it.
+# Its state lives in the session store under the ?sid= URL parameter, so a reload, a worker restart
+# or a hop to another worker resumes the same interview.
+def get_engine():
+    if st.session_state.get('engine') is None:
+        # Optional speculative prefetch of the next question (PREFETCH_QUESTIONS=1)
+        prefetcher = QuestionPrefetcher(resources.get_prefetch_executor()) if config.PREFETCH_QUESTIONS else None
+        # Optional background per-answer assessments for the map-reduce summary (MAP_REDUCE_SUMMARY=1)
+        assessor = AnswerAssessor(resources.get_assessment_executor()) if config.MAP_REDUCE_SUMMARY else None
+        collaborators = dict(agent_provider=resources.get_agent, retriever=retrieve_context, prefetcher=prefetcher,
+                             assessor=assessor)
+        session_id = st.query_params.get("sid")
+        state = resources.get_session_store().load(session_id) if session_id else None
+        if state is not None:
+            engine = InterviewSession.from_dict(state, **collaborators)
+            st.session_state.user_profile = dict(engine.profile)
+        else:
+            engine = InterviewSession(**collaborators)
+        st.session_state.engine = engine
+        st.query_params["sid"] = engine.user_id
+    return st.session_state.engine
+
+def save_engine():
+    """Hand the interview state to the session store (written behind, so this is cheap)"""
+    engine = get_engine()
+    resources.get_session_store().save(engine.user_id, engine.to_dict())
+
+def rerun():
+    save_engine()
+    st.rerun()
+
+# Render LLM output incrementally so the candidate sees the first tokens right away.
+# With to_text, chunks are whole snapshots (e.g. partial InterviewSummary objects) instead of text deltas.
+def render_stream(render, chunks, to_text=None):
+    text = ""
+    render("▌")
+    try:
+        for chunk in chunks:
+            text = to_text(chunk) if to_text is not None else text + chunk
+            render(text + "▌")
+    except LLMGatewayError as e:
+        # Rate limited / backend down after retries: show a friendly error instead of a traceback
+        render(text)
+        st.error(f"The interviewer couldn't respond right now: {e}")
+        st.button("Try again")
+        st.stop()
+    render(text)
+    return text
+
+def render_sidebar_summary(score_slot, report_slot, result):
+    """Sidebar score and report downloads, read from the cached InterviewSummary (no extra LLM call)"""
+    if result.score is not None:
+        score_slot.write(f"Score: {result.score} / 100")
+    else:
+        score_slot.write("Score: _(Not found in summary)_")
+    # --- Download Report Button ---
+    summary_text = f"Interview.io Summary\n\nScore: {result.score if result.score is not None else '?'} / 100\n\n{result.to_markdown()}\n\n"
+    for i, qa in enumerate(get_engine().qa_list, 1):
+        summary_text += f"Q{i}: {qa['q']}\nA{i}: {qa['a']}\n\n"
+    b64 = base64.b64encode(summary_text.encode()).decode()
+    href = f'<a href="data:file/txt;base64,{b64}" download="interview_report.txt">📥 Download Report</a>'
+    report_json = json.dumps({**result.to_dict(), "qa_list": get_engine().qa_list}, indent=2)
+    b64_json = base64.b64encode(report_json.encode()).decode()
+    href += f'<br><a href="data:application/json;base64,{b64_json}" download="interview_report.json">📥 Download JSON</a>'
+    report_slot.markdown(href, unsafe_allow_html=True)
+
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -180,6 +243,8 @@ with st.sidebar:
     user_profile['background'] = st.text_area("Background", value=user_profile.get('background', ''), height=60, key="sidebar_background")
     user_profile['goals'] = st.text_area("Goals", value=user_profile.get('goals', ''), height=40, key="sidebar_goals")
     st.session_state.user_profile = user_profile
+    engine = get_engine()
+    engine.update_profile(user_profile)
 
     st.markdown("---")
 
@@ -192,65 +257,56 @@ with st.sidebar:
     # --- Navigation ---
     st.markdown("## Navigation")
     if st.button("Home", key="sidebar_home"):
-        st.session_state.page = 'domain'
-        st.session_state.question_num = 1
-        st.session_state.qa_list = []
-        st.session_state.conversation = ""
-        st.session_state.current_question = None
-        st.rerun()
+        engine.reset("domain")
+        rerun()
     if st.button("Restart Interview", key="sidebar_restart"):
-        st.session_state.page = 'interview'
-        st.session_state.question_num = 1
-        st.session_state.qa_list = []
-        st.session_state.conversation = ""
-        st.session_state.current_question = None
-        st.rerun()
+        engine.reset("interview")
+        rerun()
 
     st.markdown("---")
 
     # --- Progress ---
     st.markdown("## Progress")
-    if 'question_num' in st.session_state and 'domain' in st.session_state:
-        st.write(f"Question: {st.session_state.question_num} / {getattr(config, 'NUM_QUESTIONS', 1)}")
-    if st.session_state.get('page') == 'summary':
-        # Show score if available
-        agent = InterviewerAgent(st.session_state.domain, config.GOOGLE_API_KEY)
-        user_id = "default_user"
-        if 'user_profile' in st.session_state:
-            agent.update_user_profile(user_id, st.session_state.user_profile)
-        for qa in st.session_state.qa_list:
-            agent.record_response(user_id, qa['q'], qa['a'])
-            agent.score_response(user_id, qa['a'])
-        # Use LLM-based score from summary if available
-        import re
-        summary = agent.generate_summary(user_id, st.session_state.qa_list)
-        llm_score = None
-        score_match = re.search(r"score\s*[:\-]?\s*(\d{1,3})\s*/\s*100", summary, re.IGNORECASE)
-        if score_match:
-            llm_score = int(score_match.group(1))
-        if llm_score is not None:
-            st.write(f"Score: {llm_score} / 100")
-        else:
-            st.write("Score: _(Not found in summary)_")
-        # --- Download Report Button ---
-        import base64
-        summary_text = f"Interview.io Summary\n\nScore: {llm_score if llm_score is not None else '?'} / 100\n\n"
-        for i, qa in enumerate(st.session_state.qa_list, 1):
-            summary_text += f"Q{i}: {qa['q']}\nA{i}: {qa['a']}\n\n"
-        b64 = base64.b64encode(summary_text.encode()).decode()
-        href = f'<a href="data:file/txt;base64,{b64}" download="interview_report.txt">📥 Download Report</a>'
-        st.markdown(href, unsafe_allow_html=True)
+    st.write(f"Question: {engine.question_num} / {getattr(config, 'NUM_QUESTIONS', 1)}")
+    if engine.prefetcher is not None:
+        prefetch_stats = engine.prefetcher.stats()
+        st.caption(f"Prefetch hits: {prefetch_stats['hits']} / {prefetch_stats['hits'] + prefetch_stats['misses']}")
+    if engine.user.prompt_token_counts:
+        st.caption(f"Last prompt: ~{engine.user.prompt_token_counts[-1]} tokens")
+    if engine.page == 'summary':
+        # Filled in by the summary page once the (streamed or cached) summary is available
+        sidebar_score_slot = st.empty()
+        sidebar_report_slot = st.empty()
 
     st.markdown("---")
 
     # --- Conversation History ---
     st.markdown("## Conversation History")
-    if 'qa_list' in st.session_state and st.session_state.qa_list:
-        for i, qa in enumerate(st.session_state.qa_list, 1):
+    if engine.qa_list:
+        for i, qa in enumerate(engine.qa_list, 1):
             st.markdown(f"**Q{i}:** {qa['q']}")
             st.markdown(f"**A{i}:** {qa['a']}")
             st.markdown("---")
 
+    # --- Admin panel (ADMIN_PANEL=1): recent stage timings from the in-memory telemetry sink ---
+    memory_sink = telemetry.sink(MemorySink)
+    if config.ADMIN_PANEL and memory_sink is not None:
+        with st.expander("Admin: recent stats"):
+            st.markdown("**Stages (wall time, ms)**")
+            st.table([{"stage": name, **stats} for name, stats in sorted(memory_sink.aggregate().items())])
+            st.markdown("**Last spans**")
+            st.dataframe(list(reversed(memory_sink.recent(20))), use_container_width=True)
+            st.markdown("**LLM gateway**")
+            st.json(resources.get_gateway().metrics())
+            if resources.registry.is_loaded("embedding_service"):
+                st.markdown("**Embedding service**")
+                st.json(resources.get_embedder().stats())
+            if resources.get_semantic_cache() is not None:
+                st.markdown("**Semantic question cache**")
+                st.json(resources.get_semantic_cache().stats())
+            st.markdown("**Resources**")
+            st.json(resources.registry.report())
+
     # --- Help & Tips Section ---
     st.markdown("---")
     with st.expander("Help & Tips"):
@@ -262,27 +318,13 @@ with st.sidebar:
         - For best results, answer questions thoughtfully and in detail.
         """)
 
-# Initialize session state
-if 'page' not in st.session_state:
-    st.session_state.page = 'domain'  # domain, interview, summary
-if 'domain' not in st.session_state:
-    st.session_state.domain = None
-if 'question_num' not in st.session_state:
-    st.session_state.question_num = 1
-if 'qa_list' not in st.session_state:
-    st.session_state.qa_list = []
-if 'conversation' not in st.session_state:
-    st.session_state.conversation = ""
-if 'current_question' not in st.session_state:
-    st.session_state.current_question = None
-
-# Check API key
-if not config.GOOGLE_API_KEY:
+# Check API key (the offline stub provider doesn't need one)
+if config.LLM_PROVIDER == "gemini" and not config.GOOGLE_API_KEY:
     st.error("❌ GOOGLE_API_KEY not found in .env")
     st.stop()
 
 # PAGE 1: Domain Selection
-if st.session_state.page == 'domain':
+if engine.page == 'domain':
     st.markdown("# Interview.io")
     st.markdown("#### *just a few questions away from acing your interviews*")
     st.markdown("Select your interview domain")
@@ -291,6 +333,8 @@ if st.session_state.page == 'domain':
     user_name = st.text_input("Your Name", key="user_name")
     user_background = st.text_area("Background / Experience", key="user_background", height=80)
     user_goals = st.text_area("Career Goals / Interests", key="user_goals", height=60)
+    user_seniority = st.selectbox("Seniority (optional)", ["", "junior", "mid", "senior"], key="user_seniority",
+                                  format_func=lambda level: level.capitalize() or "Any")
 
     st.markdown("### (Optional) Upload your Resume and Job Description")
     resume_file = st.file_uploader("Upload Resume (PDF or TXT)", type=["pdf", "txt"], key="resume_file")
@@ -307,114 +351,53 @@ if st.session_state.page == 'domain':
     st.session_state.user_profile['name'] = user_name
     st.session_state.user_profile['background'] = user_background
     st.session_state.user_profile['goals'] = user_goals
-
-    col1, col2, col3 = st.columns(3)
+    st.session_state.user_profile['seniority'] = user_seniority
+    engine.update_profile(st.session_state.user_profile)
 
     def can_start_interview():
         return user_name.strip() != "" and user_background.strip() != ""
 
-    with col1:
-        if st.button("Engineering", use_container_width=True, disabled=not can_start_interview()):
-            st.session_state.domain = 'engineering'
-            st.session_state.page = 'interview'
-            st.session_state.question_num = 1
-            st.session_state.qa_list = []
-            st.session_state.conversation = ""
-            # Vectorize and store docs
-            user_id = "default_user"
-            from streamlit.runtime.uploaded_file_manager import UploadedFile
-            user_profile = st.session_state.user_profile
-            resume_text, jobdesc_text, profile_text = store_user_docs_and_vectors(
-                user_id,
-                resume_file,
-                jobdesc_file,
-                user_profile
-            )
-            st.session_state.resume_text = resume_text if resume_text is not None else ""
-            st.session_state.jobdesc_text = jobdesc_text if jobdesc_text is not None else ""
-            st.session_state.profile_text = profile_text if profile_text is not None else ""
-            st.rerun()
-
-    with col2:
-        if st.button("Management", use_container_width=True, disabled=not can_start_interview()):
-            st.session_state.domain = 'management'
-            st.session_state.page = 'interview'
-            st.session_state.question_num = 1
-            st.session_state.qa_list = []
-            st.session_state.conversation = ""
-            user_id = "default_user"
-            user_profile = st.session_state.user_profile
-            resume_text, jobdesc_text, profile_text = store_user_docs_and_vectors(
-                user_id,
-                resume_file,
-                jobdesc_file,
-                user_profile
-            )
-            st.session_state.resume_text = resume_text if resume_text is not None else ""
-            st.session_state.jobdesc_text = jobdesc_text if jobdesc_text is not None else ""
-            st.session_state.profile_text = profile_text if profile_text is not None else ""
-            st.rerun()
-
-    with col3:
-        if st.button("HR", use_container_width=True, disabled=not can_start_interview()):
-            st.session_state.domain = 'hr'
-            st.session_state.page = 'interview'
-            st.session_state.question_num = 1
-            st.session_state.qa_list = []
-            st.session_state.conversation = ""
-            user_id = "default_user"
-            user_profile = st.session_state.user_profile
-            resume_text, jobdesc_text, profile_text = store_user_docs_and_vectors(
-                user_id,
-                resume_file,
-                jobdesc_file,
-                user_profile
-            )
-            st.session_state.resume_text = resume_text if resume_text is not None else ""
-            st.session_state.jobdesc_text = jobdesc_text if jobdesc_text is not None else ""
-            st.session_state.profile_text = profile_text if profile_text is not None else ""
-            st.rerun()
+    for col, (domain, label) in zip(st.columns(3), DOMAIN_BUTTONS.items()):
+        with col:
+            if st.button(label, use_container_width=True, disabled=not can_start_interview()):
+                # Vectorize and store docs, then start the interview
+                resume_text, jobdesc_text, profile_text = store_user_docs_and_vectors(
+                    engine.user_id,
+                    resume_file,
+                    jobdesc_file,
+                    st.session_state.user_profile
+                )
+                engine.start(domain, st.session_state.user_profile, resume_text, jobdesc_text, profile_text)
+                rerun()
 
 # PAGE 2: Interview
-elif st.session_state.page == 'interview':
+elif engine.page == 'interview':
     # Guard against missing domain (should not happen, but prevents KeyError)
-    if st.session_state.domain not in config.DOMAIN_TEMPLATES:
+    if engine.domain not in config.DOMAIN_TEMPLATES:
         st.error("Interview domain not set. Please return to the home page and select a domain.")
     else:
-        domain_name = config.DOMAIN_TEMPLATES[st.session_state.domain]['name']
+        domain_name = config.DOMAIN_TEMPLATES[engine.domain]['name']
         st.markdown(f"# {domain_name} Interview")
-        st.markdown(f"Question {st.session_state.question_num} of {config.NUM_QUESTIONS}")
+        for warning in st.session_state.pop('upload_warnings', []):
+            st.warning(f"Ignored upload - {warning}")
+        st.markdown(f"Question {engine.question_num} of {config.NUM_QUESTIONS}")
         
         # Progress bar
-        progress = st.session_state.question_num / config.NUM_QUESTIONS
+        progress = engine.question_num / config.NUM_QUESTIONS
         st.progress(progress)
         
-        # Initialize agent if needed
-        if st.session_state.current_question is None:
-            with st.spinner("Generating question..."):
-                agent = InterviewerAgent(st.session_state.domain, config.GOOGLE_API_KEY)
-                # Store user profile in agent
-                user_id = "default_user"  # Replace with real user/session id if available
-                if 'user_profile' in st.session_state:
-                    agent.update_user_profile(user_id, st.session_state.user_profile)
-                question = agent.generate_question(
-                    user_id,
-                    st.session_state.question_num,
-                    st.session_state.conversation,
-                    st.session_state.get("resume_text", ""),
-                    st.session_state.get("jobdesc_text", "")
-                )
-                st.session_state.current_question = question
-        
-        # Display question
-        st.info(st.session_state.current_question)
+        # Display question, streaming it in if it hasn't been generated yet
+        # (this also starts prefetching the next one while the candidate types)
+        question_slot = st.empty()
+        render_stream(question_slot.info, engine.stream_next_question())
+        save_engine()
         
         # User answer
         user_answer = st.text_area(
             "Your answer:",
             height=150,
             placeholder="Type your answer here...",
-            key=f"answer_{st.session_state.question_num}"
+            key=f"answer_{engine.question_num}"
         )
         
         col1, col2 = st.columns(2)
@@ -422,65 +405,30 @@ elif st.session_state.page == 'interview':
         with col1:
             if st.button("✅ Submit Answer", type="primary", use_container_width=True):
                 if user_answer.strip():
-                    # Store Q&A
-                    q_text = config.DOMAIN_TEMPLATES[st.session_state.domain]['questions'][
-                        st.session_state.question_num - 1
-                    ]
-                    st.session_state.qa_list.append({
-                        'q': q_text,
-                        'a': user_answer
-                    })
-                    
-                    # Update conversation
-                    st.session_state.conversation += f"\nQ: {q_text}\nA: {user_answer}"
-                    
-                    # Check if done
-                    if st.session_state.question_num >= config.NUM_QUESTIONS:
-                        st.session_state.page = 'summary'
-                        st.rerun()
-                    else:
-                        # Next question
-                        st.session_state.question_num += 1
-                        st.session_state.current_question = None
-                        st.rerun()
+                    engine.answer(user_answer)
+                    rerun()
                 else:
                     st.warning("Please provide an answer")
         
         with col2:
             if st.button("← Back to Domain", use_container_width=True):
-                st.session_state.page = 'domain'
-                st.session_state.question_num = 1
-                st.session_state.qa_list = []
-                st.session_state.conversation = ""
-                st.session_state.current_question = None
-                st.rerun()
+                engine.reset("domain")
+                rerun()
 
 # PAGE 3: Summary
-elif st.session_state.page == 'summary':
-    domain_name = config.DOMAIN_TEMPLATES[st.session_state.domain]['name']
+elif engine.page == 'summary':
+    domain_name = config.DOMAIN_TEMPLATES[engine.domain]['name']
     st.markdown(f"# Interview.io Summary - {domain_name}")
     st.markdown("#### *just a few questions away from acing your interviews*")
     
-    # Generate summary
-    with st.spinner("Generating summary..."):
-        agent = InterviewerAgent(st.session_state.domain, config.GOOGLE_API_KEY)
-        user_id = "default_user"
-        if 'user_profile' in st.session_state:
-            agent.update_user_profile(user_id, st.session_state.user_profile)
-        # Record all Q&A in agent for scoring and summary
-        for qa in st.session_state.qa_list:
-            agent.record_response(user_id, qa['q'], qa['a'])
-            agent.score_response(user_id, qa['a'])
-        summary = agent.generate_summary(user_id, st.session_state.qa_list)
-
-    st.markdown(summary)
-
-    # Extract LLM-based score from summary (expects "score out of 100" in summary)
-    import re
-    llm_score = None
-    score_match = re.search(r"score\s*[:\-]?\s*(\d{1,3})\s*/\s*100", summary, re.IGNORECASE)
-    if score_match:
-        llm_score = int(score_match.group(1))
+    # Generate summary (streamed on first view, then cached and shared with the sidebar score and report)
+    summary_slot = st.empty()
+    render_stream(summary_slot.markdown, engine.stream_summary(), to_text=lambda partial: partial.to_markdown())
+    result = engine.summary()
+    save_engine()
+    llm_score = result.score
+    render_sidebar_summary(sidebar_score_slot, sidebar_report_slot, result)
+
     if llm_score is not None:
         st.markdown(f"""
             <div style="display:flex;align-items:center;gap:1rem;">
@@ -510,10 +458,13 @@ elif st.session_state.page == 'summary':
     
     # Q&A recap
     with st.expander("📋 Full Q&A Recap"):
-        for i, qa in enumerate(st.session_state.qa_list, 1):
+        answer_scores = engine.user.answer_scores if len(engine.user.answer_scores) == len(engine.qa_list) else []
+        for i, qa in enumerate(engine.qa_list, 1):
             st.markdown(f"### Question {i}")
             st.write(f"**Q:** {qa['q']}")
             st.write(f"**A:** {qa['a']}")
+            if answer_scores:
+                st.caption(f"Answer rubric: {answer_scores[i - 1]['score']} / 100")
             st.divider()
     
     st.divider()
@@ -522,18 +473,10 @@ elif st.session_state.page == 'summary':
     
     with col1:
         if st.button("New Interview", use_container_width=True, type="primary"):
-            st.session_state.page = 'domain'
-            st.session_state.question_num = 1
-            st.session_state.qa_list = []
-            st.session_state.conversation = ""
-            st.session_state.current_question = None
-            st.rerun()
+            engine.reset("domain")
+            rerun()
     
     with col2:
         if st.button("Home", use_container_width=True):
-            st.session_state.page = 'domain'
-            st.session_state.question_num = 1
-            st.session_state.qa_list = []
-            st.session_state.conversation = ""
-            st.session_state.current_question = None
-            st.rerun()
\ No newline at end of file
+            engine.reset("domain")
+            rerun()
\ No newline at end of file
@@ -0,0 +1,50 @@
+"""
+Map step of the map-reduce summary: each answer is assessed in the background as soon as it is submitted
+"""
+import time
+import logging
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+
+class AnswerAssessor:
+    """
+    Runs agent.assess_answer for every submitted answer on a shared executor, so by the end of
+    the interview the summary only has to reduce a handful of short assessments.
+    Results are keyed by the answer's index in qa_list.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.pending = {}  # qa_list index -> Future
+        self.completed = 0
+        self.failed = 0
+        self.missed = 0
+
+    def submit(self, agent, session, index: int, question: str, answer: str):
+        self.pending[index] = self.executor.submit(agent.assess_answer, session, question, answer)
+
+    def collect(self, wait_seconds: float = 0.0) -> dict:
+        """{index: assessment} for the finished assessments, waiting up to `wait_seconds` in total for the rest"""
+        deadline = time.monotonic() + wait_seconds
+        results = {}
+        for index, future in sorted(self.pending.items()):
+            try:
+                results[index] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+                self.completed += 1
+            except FutureTimeoutError:
+                future.cancel()
+                self.missed += 1
+            except Exception as e:
+                logging.warning(f"Background answer assessment failed: {e}")
+                self.failed += 1
+        self.pending.clear()
+        return results
+
+    def discard(self):
+        """Drop outstanding assessments (e.g. on restart)"""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def stats(self) -> dict:
+        return {"pending": len(self.pending), "completed": self.completed, "failed": self.failed, "missed": self.missed}
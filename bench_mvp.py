@@ -0,0 +1,525 @@
+"""
+Benchmarks for the interview hot paths.
+
+    python bench_mvp.py                                  # all stages, print results
+    python bench_mvp.py --stages prompt,e2e --output baseline.json
+    python bench_mvp.py --compare baseline.json          # exit 1 on a p95 regression
+    python bench_mvp.py --stages startup                 # exit 1 if imports exceed --import-budget-ms
+
+Stages: startup (cold import of the landing page modules), extract (PDF/TXT text extraction),
+encode (configured encoder), embed_service (concurrent encodes, direct vs micro-batched),
+encoder_backends (load time, RSS, throughput and retrieval agreement with fp32 of each encoder backend),
+chroma (upsert/query), prompt (question/summary prompt assembly), e2e (simulated interviews against the stub LLM).
+Stages whose dependencies aren't installed are reported as skipped.
+"""
+import io
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import config_mvp as config
+from resources_mvp import current_rss_mb
+
+# What app_mvp imports before the landing page renders; none of them may pull in HEAVY_MODULES
+APP_MODULES = ("config_mvp", "telemetry_mvp", "extraction_mvp", "llm_gateway_mvp", "resources_mvp",
+               "prefetch_mvp", "assessment_mvp", "retrieval_mvp", "engine_mvp")
+HEAVY_MODULES = ("torch", "sentence_transformers", "chromadb", "pdfplumber", "langchain_google_genai", "numpy")
+STARTUP_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+for name in sys.argv[1].split(","):
+    __import__(name)
+print(json.dumps({"seconds": time.perf_counter() - start,
+                  "heavy": [name for name in sys.argv[2].split(",") if name in sys.modules]}))
+"""
+ENCODER_PROBE = """
+import sys, json, time
+start = time.perf_counter()
+from encoder_backends_mvp import create_encoder
+encoder = create_encoder(sys.argv[1])
+load_seconds = time.perf_counter() - start
+import numpy as np
+from resources_mvp import current_rss_mb
+with open(sys.argv[2]) as f:
+    texts = json.load(f)
+vectors = np.asarray(encoder.encode(texts), dtype=np.float32)
+start = time.perf_counter()
+for _ in range(int(sys.argv[3])):
+    encoder.encode(texts)
+encode_seconds = time.perf_counter() - start
+np.save(sys.argv[4], vectors)
+print(json.dumps({"load_seconds": load_seconds, "encode_seconds": encode_seconds, "peak_rss_mb": current_rss_mb(),
+                  "torch_loaded": "torch" in sys.modules}))
+"""
+
+WORDS = ("python distributed systems kubernetes team lead designed implemented reduced latency "
+         "migrated services stakeholders hiring roadmap postgres kafka mentoring budget delivered "
+         "customers analytics pipeline reliability on-call incident quarterly goals collaboration").split()
+
+
+def sample_text(words: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    lines = []
+    for start in range(0, words, 12):
+        lines.append(" ".join(rng.choice(WORDS) for _ in range(min(12, words - start))))
+    return "\n".join(lines)
+
+
+def make_pdf(pages: int, lines_per_page: int = 40, seed: int = 0) -> bytes:
+    """Minimal valid multi-page text PDF, so the benchmark needs no fixture files"""
+    rng = random.Random(seed)
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for _ in range(pages):
+        text_ops = ["BT /F1 10 Tf 50 780 Td 14 TL"]
+        for _ in range(lines_per_page):
+            line = " ".join(rng.choice(WORDS) for _ in range(10))
+            text_ops.append(f"({line}) Tj T*")
+        text_ops.append("ET")
+        stream = "\n".join(text_ops)
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        content_id = len(objects)
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>"
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(f"{i} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(p / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def summarize(latencies: list, items: int = None, wall_seconds: float = None) -> dict:
+    """p50/p95/p99 in ms plus throughput (items per second of wall time)"""
+    values = sorted(latencies)
+    wall_seconds = wall_seconds if wall_seconds is not None else sum(values)
+    items = items if items is not None else len(values)
+    return {
+        "n": len(values),
+        "p50_ms": round(percentile(values, 50) * 1000, 3),
+        "p95_ms": round(percentile(values, 95) * 1000, 3),
+        "p99_ms": round(percentile(values, 99) * 1000, 3),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3) if values else 0.0,
+        "throughput_per_s": round(items / wall_seconds, 2) if wall_seconds else None,
+    }
+
+
+def timed(fn, iterations: int) -> list:
+    latencies = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+# --- stages ---
+
+def _import_probe(modules) -> dict:
+    """Import `modules` in a fresh interpreter; seconds taken and which HEAVY_MODULES came along"""
+    import subprocess
+    completed = subprocess.run(
+        [sys.executable, "-c", STARTUP_PROBE, ",".join(modules), ",".join(HEAVY_MODULES)],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if completed.returncode != 0:
+        error = (completed.stderr.strip().splitlines() or ["import failed"])[-1]
+        raise ImportError(error, name=error.split("'")[1] if "'" in error else None)
+    return json.loads(completed.stdout)
+
+
+def bench_startup(args) -> dict:
+    import importlib.util
+    runs = [_import_probe(APP_MODULES) for _ in range(max(3, args.iterations // 4))]
+    results = {
+        "app_imports": summarize([run["seconds"] for run in runs]),
+        "heavy_modules_loaded": runs[0]["heavy"],
+        "import_budget_ms": args.import_budget_ms,
+    }
+    if importlib.util.find_spec("streamlit") is not None:
+        results["streamlit_import"] = summarize([_import_probe(["streamlit"])["seconds"] for _ in range(3)])
+    results["within_budget"] = (results["app_imports"]["p95_ms"] <= args.import_budget_ms
+                                and not results["heavy_modules_loaded"])
+    return results
+
+
+def bench_extract(args) -> dict:
+    import extraction_mvp as extraction
+    results = {}
+    txt = sample_text(800).encode("utf-8")
+    cases = {"txt_800_words": (txt, "text/plain")}
+    try:
+        import pdfplumber  # noqa: F401
+        cases["pdf_2_pages"] = (make_pdf(2), "application/pdf")
+        cases["pdf_20_pages"] = (make_pdf(20), "application/pdf")
+    except ImportError:
+        results["pdf"] = {"skipped": "pdfplumber not installed"}
+    for name, (data, mime_type) in cases.items():
+        def run():
+            extraction._cache.clear()  # measure real extraction, not the hash cache
+            extraction.extract_text_from_bytes(data, mime_type)
+        results[name] = summarize(timed(run, args.iterations))
+    results["cached_hit"] = summarize(timed(lambda: extraction.extract_text_from_bytes(txt, "text/plain"), args.iterations))
+    return results
+
+
+def bench_encode(args) -> dict:
+    import resources_mvp as resources
+    from retrieval_mvp import chunk_text
+    encoder = resources.get_encoder()
+    chunks = chunk_text(sample_text(1500))
+    results = {"load": resources.registry.stats.get("encoder", {})}
+    results["chunks"] = len(chunks)
+    wall = time.perf_counter()
+    latencies = timed(lambda: encoder.encode(chunks), args.iterations)
+    results["encode_resume"] = summarize(latencies, len(chunks) * args.iterations, time.perf_counter() - wall)
+    results["encode_query"] = summarize(timed(lambda: encoder.encode(["Tell me about system design"]), args.iterations))
+    return results
+
+
+def bench_embed_service(args) -> dict:
+    """Concurrent sessions encoding a few chunks each: direct model calls vs the micro-batching service"""
+    import resources_mvp as resources
+    from retrieval_mvp import chunk_text
+    from embedding_service_mvp import EmbeddingService
+    encoder = resources.get_encoder()
+    documents = [chunk_text(sample_text(300, seed))[:4] for seed in range(args.interviews)]
+
+    def concurrent_encode(target) -> dict:
+        latencies = []
+        lock = threading.Lock()
+
+        def one_session(chunks):
+            start = time.perf_counter()
+            target.encode(chunks)
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+        wall = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            for _ in range(args.iterations):
+                list(pool.map(one_session, documents))
+        texts = sum(len(chunks) for chunks in documents) * args.iterations
+        return summarize(latencies, texts, time.perf_counter() - wall)
+
+    service = EmbeddingService(lambda: encoder)
+    results = {
+        "concurrency": args.concurrency,
+        "direct": concurrent_encode(encoder),
+        "batched": concurrent_encode(service),
+    }
+    service.close()
+    results["service"] = service.stats()
+    return results
+
+
+def _encoder_probe(backend: str, texts_path: str, iterations: int, vectors_path: str) -> dict:
+    """Load `backend` in a fresh interpreter (clean load time and RSS), encode the texts and save their vectors"""
+    import subprocess
+    completed = subprocess.run(
+        [sys.executable, "-c", ENCODER_PROBE, backend, texts_path, str(iterations), vectors_path],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if completed.returncode != 0:
+        return {"skipped": (completed.stderr.strip().splitlines() or ["failed"])[-1]}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def retrieval_agreement(reference, candidate, queries: int, k: int) -> dict:
+    """
+    How closely `candidate` vectors reproduce `reference` (fp32) ones for the same texts: the first
+    `queries` rows are queries, the rest the corpus. Reports the mean cosine between the two vectors
+    of each text, top-1 agreement and top-k overlap of the corpus retrieval per query.
+    """
+    import numpy as np
+
+    def normalized(vectors):
+        return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    reference, candidate = normalized(reference), normalized(candidate)
+    k = min(k, len(reference) - queries)
+    top_reference = np.argsort(-(reference[:queries] @ reference[queries:].T), axis=1)[:, :k]
+    top_candidate = np.argsort(-(candidate[:queries] @ candidate[queries:].T), axis=1)[:, :k]
+    overlaps = [len(set(a) & set(b)) / k for a, b in zip(top_reference, top_candidate)]
+    return {
+        "mean_cosine_to_fp32": round(float((reference * candidate).sum(axis=1).mean()), 4),
+        "top1_agreement": round(float((top_reference[:, 0] == top_candidate[:, 0]).mean()), 4),
+        f"top{k}_overlap": round(float(np.mean(overlaps)), 4),
+    }
+
+
+def bench_encoder_backends(args) -> dict:
+    """Load time, peak RSS, encode throughput and retrieval agreement with fp32 for each encoder backend"""
+    import glob
+    import tempfile
+    import numpy as np
+    from retrieval_mvp import chunk_text
+    # Queries: every template question; corpus: chunks of the sample resumes (--resumes) or generated ones,
+    # plus the reference answers so there is always realistic text to retrieve
+    queries = [question for info in config.DOMAIN_TEMPLATES.values() for question in info["questions"]]
+    resumes = []
+    for path in sorted(glob.glob(args.resumes))[:50] if args.resumes else []:
+        with open(path, errors="ignore") as f:
+            resumes.append(f.read())
+    resumes = resumes or [sample_text(400, seed) for seed in range(10)]
+    corpus = [chunk for resume in resumes for chunk in chunk_text(resume)]
+    corpus += [answer for info in config.DOMAIN_TEMPLATES.values() for answer in info.get("reference_answers", [])]
+    texts = queries + corpus
+    results = {"queries": len(queries), "corpus_chunks": len(corpus), "backends": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        texts_path = os.path.join(tmp, "texts.json")
+        with open(texts_path, "w") as f:
+            json.dump(texts, f)
+        vectors = {}
+        for backend in args.backends.split(","):
+            vectors_path = os.path.join(tmp, f"{backend}.npy")
+            _encoder_probe(backend, texts_path, 1, vectors_path)  # first run downloads/exports the model
+            probe = _encoder_probe(backend, texts_path, args.iterations // 4 or 1, vectors_path)
+            if "skipped" not in probe:
+                vectors[backend] = np.load(vectors_path)
+                probe["texts_per_s"] = round(len(texts) * (args.iterations // 4 or 1) / probe.pop("encode_seconds"), 1)
+                probe["load_seconds"] = round(probe["load_seconds"], 3)
+                probe["peak_rss_mb"] = round(probe["peak_rss_mb"], 1)
+            results["backends"][backend] = probe
+        if "fp32" in vectors:
+            for backend, candidate in vectors.items():
+                if backend != "fp32":
+                    results["backends"][backend]["agreement"] = retrieval_agreement(
+                        vectors["fp32"], candidate, len(queries), config.RETRIEVAL_TOP_K
+                    )
+    return results
+
+
+def bench_chroma(args) -> dict:
+    import chromadb
+    rng = random.Random(0)
+    dim = 384
+    client = chromadb.Client()
+    collection = client.get_or_create_collection(f"bench_{int(time.time() * 1000)}")
+    per_user = 20
+
+    def vectors(n):
+        return [[rng.random() for _ in range(dim)] for _ in range(n)]
+
+    upserts = []
+    for user in range(args.iterations):
+        ids = [f"user{user}_{i}" for i in range(per_user)]
+        embeddings = vectors(per_user)
+        start = time.perf_counter()
+        collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=[f"chunk {i}" for i in range(per_user)],
+            metadatas=[{"user_id": f"user{user}", "type": "resume", "last_seen": 0} for _ in range(per_user)]
+        )
+        upserts.append(time.perf_counter() - start)
+    queries = []
+    for user in range(args.iterations):
+        query = vectors(1)
+        start = time.perf_counter()
+        collection.query(query_embeddings=query, n_results=config.RETRIEVAL_TOP_K,
+                         where={"$and": [{"user_id": f"user{user}"}, {"type": {"$ne": "profile"}}]})
+        queries.append(time.perf_counter() - start)
+    client.delete_collection(collection.name)
+    return {"upsert_20_chunks": summarize(upserts), "query_top_k": summarize(queries)}
+
+
+def _stub_agents(first_token_ms: float, tokens_per_second: float):
+    """Agents on the stub provider behind an unthrottled gateway, so only our own overhead is measured"""
+    from agent_mvp import InterviewerAgent
+    from llm_gateway_mvp import LLMGateway
+    from llm_providers_mvp import StubLLM
+    gateway = LLMGateway(
+        StubLLM(first_token_ms=first_token_ms, jitter_ms=0, tokens_per_second=tokens_per_second),
+        max_concurrency=1000, rate_per_second=1e9, burst=1e9
+    )
+    return {domain: InterviewerAgent(domain, gateway=gateway) for domain in config.DOMAIN_TEMPLATES}
+
+
+def bench_prompt(args) -> dict:
+    from agent_mvp import UserSession
+    from memory_mvp import ConversationMemory
+    agent = _stub_agents(0, 1e9)["engineering"]
+    session = UserSession("bench")
+    session.update_profile({"name": "Bench", "background": sample_text(40), "goals": "staff engineer"})
+    memory = ConversationMemory()
+    qa_list = []
+    for i, question in enumerate(config.DOMAIN_TEMPLATES["engineering"]["questions"]):
+        answer = sample_text(150, seed=i)
+        memory.add_turn(question, answer)
+        qa_list.append({"q": question, "a": answer})
+    resume, jobdesc = sample_text(1500, 1), sample_text(500, 2)
+    passages = [{"type": "resume", "text": sample_text(120, i)} for i in range(config.RETRIEVAL_TOP_K)]
+    return {
+        "question_prompt": summarize(timed(
+            lambda: agent.build_question_prompt(session, 5, memory.render(), resume, jobdesc, passages), args.iterations * 10)),
+        "summary_prompt": summarize(timed(lambda: agent.build_summary_prompt(session, qa_list), args.iterations * 10)),
+        "memory_add_turn": summarize(timed(lambda: ConversationMemory().add_turn("q", sample_text(150)), args.iterations * 10)),
+    }
+
+
+def bench_e2e(args) -> dict:
+    from engine_mvp import InterviewSession
+    agents = _stub_agents(args.stub_first_token_ms, args.stub_tokens_per_second)
+    turn_latencies = []
+    interview_latencies = []
+    lock = threading.Lock()
+
+    def one_interview(i):
+        domain = sorted(agents)[i % len(agents)]
+        interview = InterviewSession(agent_provider=agents.get)
+        started = time.perf_counter()
+        interview.start(domain, {"name": f"candidate {i}", "background": sample_text(30, i)})
+        turns = []
+        while not interview.finished:
+            turn_start = time.perf_counter()
+            interview.next_question()
+            interview.answer(sample_text(120, i))
+            turns.append(time.perf_counter() - turn_start)
+        interview.summary()
+        with lock:
+            turn_latencies.extend(turns)
+            interview_latencies.append(time.perf_counter() - started)
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        list(pool.map(one_interview, range(args.interviews)))
+    wall = time.perf_counter() - wall
+    return {
+        "interviews": args.interviews,
+        "concurrency": args.concurrency,
+        "stub_first_token_ms": args.stub_first_token_ms,
+        "turn": summarize(turn_latencies, wall_seconds=wall),
+        "interview": summarize(interview_latencies, wall_seconds=wall),
+    }
+
+
+STAGES = {
+    "startup": bench_startup,
+    "extract": bench_extract,
+    "encode": bench_encode,
+    "embed_service": bench_embed_service,
+    "encoder_backends": bench_encoder_backends,
+    "chroma": bench_chroma,
+    "prompt": bench_prompt,
+    "e2e": bench_e2e,
+}
+
+
+def peak_rss_mb() -> float:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024, 1)
+    except ImportError:
+        return round(current_rss_mb(), 1)
+
+
+def run(args) -> dict:
+    report = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "stages": {},
+    }
+    for name in args.stages:
+        start = time.perf_counter()
+        try:
+            result = STAGES[name](args)
+        except ImportError as e:
+            result = {"skipped": f"missing dependency: {e.name}"}
+        result["stage_seconds"] = round(time.perf_counter() - start, 3)
+        result["rss_mb_after"] = round(current_rss_mb(), 1)
+        report["stages"][name] = result
+    report["peak_rss_mb"] = peak_rss_mb()
+    return report
+
+
+def _latency_metrics(stage: dict, prefix: str = ""):
+    """Flatten {metric: {p95_ms: ...}} into {"metric.p95_ms": value}"""
+    for key, value in stage.items():
+        if isinstance(value, dict):
+            if "p95_ms" in value:
+                yield f"{prefix}{key}.p95_ms", value["p95_ms"]
+            else:
+                yield from _latency_metrics(value, f"{prefix}{key}.")
+
+
+def compare(report: dict, baseline: dict, tolerance: float, min_delta_ms: float = 0.05) -> list:
+    """Metrics whose p95 got more than `tolerance` (fraction) and `min_delta_ms` slower than the baseline"""
+    regressions = []
+    for stage_name, stage in report["stages"].items():
+        old = dict(_latency_metrics(baseline.get("stages", {}).get(stage_name, {})))
+        for metric, value in _latency_metrics(stage):
+            before = old.get(metric)
+            if before and value > before * (1 + tolerance) and value - before > min_delta_ms:
+                regressions.append(f"{stage_name}.{metric}: {before} ms -> {value} ms (+{(value / before - 1) * 100:.0f}%)")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the interview hot paths")
+    parser.add_argument("--stages", default=",".join(STAGES), help=f"comma-separated subset of {','.join(STAGES)}")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--interviews", type=int, default=20, help="simulated interviews for the e2e stage")
+    parser.add_argument("--concurrency", type=int, default=8, help="concurrent simulated interviews")
+    parser.add_argument("--backends", default="fp32,int8,onnx,onnx-int8", help="encoder backends for encoder_backends")
+    parser.add_argument("--resumes", help="glob of sample resume .txt files for encoder_backends (default: generated text)")
+    parser.add_argument("--stub-first-token-ms", type=float, default=0.0)
+    parser.add_argument("--stub-tokens-per-second", type=float, default=1e6)
+    parser.add_argument("--output", help="write the JSON report here (e.g. a baseline)")
+    parser.add_argument("--compare", help="baseline JSON to compare p95 latencies against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 slowdown before failing (0.2 = 20%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this (timer noise)")
+    parser.add_argument("--import-budget-ms", type=float, default=300,
+                        help="p95 cold import time allowed for the landing page modules (startup stage)")
+    args = parser.parse_args(argv)
+    args.stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+    unknown = set(args.stages) - set(STAGES)
+    if unknown:
+        parser.error(f"unknown stages: {', '.join(sorted(unknown))}")
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    startup = report["stages"].get("startup", {})
+    if startup.get("within_budget") is False:
+        print(f"\nStartup over budget: imports p95 {startup['app_imports']['p95_ms']} ms "
+              f"(budget {args.import_budget_ms:g} ms), heavy modules loaded: {startup['heavy_modules_loaded']}",
+              file=sys.stderr)
+        return 1
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("\nRegressions:\n" + "\n".join(regressions), file=sys.stderr)
+            return 1
+        print("\nNo p95 regressions against the baseline.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -9,6 +9,84 @@ load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY", "")
 GEMINI_MODEL = "gemini-2.5-flash"
 
+# LLM backend: "gemini", or "stub" for a deterministic offline model (no network, no API quota)
+LLM_PROVIDER = os.getenv("LLM_PROVIDER", "gemini")
+STUB_FIRST_TOKEN_MS = float(os.getenv("STUB_FIRST_TOKEN_MS", "300"))
+STUB_JITTER_MS = float(os.getenv("STUB_JITTER_MS", "100"))
+STUB_TOKENS_PER_SECOND = float(os.getenv("STUB_TOKENS_PER_SECOND", "80"))
+STUB_ERROR_RATE = float(os.getenv("STUB_ERROR_RATE", "0"))
+STUB_SEED = int(os.getenv("STUB_SEED", "0"))
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+# Encoder runtime for that model: fp32 (sentence-transformers/torch), int8 (torch dynamic quantization),
+# onnx / onnx-int8 (exported graph on onnxruntime, no torch). Compare with `python bench_mvp.py --stages encoder_backends`
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "fp32")
+
+# Content-addressed embedding cache (memory-mapped on disk; set EMBEDDING_CACHE_DIR="" to keep it in RAM)
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", ".cache/embeddings")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "20000"))  # max cached vectors
+
+# Micro-batching embedding service: encode calls from all sessions are queued and coalesced into one
+# forward pass per window on a dedicated thread (EMBEDDING_BATCHING=0 calls the model directly)
+EMBEDDING_BATCHING = os.getenv("EMBEDDING_BATCHING", "1") == "1"
+EMBEDDING_BATCH_WINDOW_MS = float(os.getenv("EMBEDDING_BATCH_WINDOW_MS", "5"))
+EMBEDDING_MAX_BATCH = int(os.getenv("EMBEDDING_MAX_BATCH", "64"))  # texts per forward pass
+EMBEDDING_TORCH_THREADS = int(os.getenv("EMBEDDING_TORCH_THREADS", "0"))  # torch/onnxruntime threads, 0 = default
+
+# Opt-in preload: import and load the encoder, vector store, PDF parser and LLM client in a background
+# thread on the first page load (otherwise each loads on first use)
+WARM_UP_RESOURCES = os.getenv("WARM_UP_RESOURCES", "0") == "1"
+
+# Speculatively generate the next question in the background while the candidate types
+PREFETCH_QUESTIONS = os.getenv("PREFETCH_QUESTIONS", "0") == "1"
+PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+PREFETCH_WAIT_SECONDS = float(os.getenv("PREFETCH_WAIT_SECONDS", "0.5"))  # how long Submit waits for an unfinished prefetch
+# A prefetched question is written before the answer exists, so it can't follow up on it: it is only used
+# when the answer is short or stays on the asked topic (share of the question's words it mentions),
+# otherwise the question is regenerated from the real answer
+PREFETCH_MAX_ANSWER_WORDS = int(os.getenv("PREFETCH_MAX_ANSWER_WORDS", "40"))
+PREFETCH_MIN_TOPIC_OVERLAP = float(os.getenv("PREFETCH_MIN_TOPIC_OVERLAP", "0.3"))
+
+# Map-reduce summary: assess each answer in the background on submit, so the final summary only reduces
+# short assessments and its latency stays flat as interviews get longer (one extra small LLM call per answer)
+MAP_REDUCE_SUMMARY = os.getenv("MAP_REDUCE_SUMMARY", "0") == "1"
+ASSESSMENT_WORKERS = int(os.getenv("ASSESSMENT_WORKERS", "4"))
+ASSESSMENT_WAIT_SECONDS = float(os.getenv("ASSESSMENT_WAIT_SECONDS", "2"))  # summary waits this long for stragglers
+
+# LLM gateway: concurrency cap, rate limit, retries with jittered backoff, deadline, circuit breaker
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+LLM_RATE_PER_SECOND = float(os.getenv("LLM_RATE_PER_SECOND", "5"))
+LLM_BURST = int(os.getenv("LLM_BURST", "10"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "4"))
+LLM_BACKOFF_BASE_SECONDS = float(os.getenv("LLM_BACKOFF_BASE_SECONDS", "0.5"))
+LLM_BACKOFF_MAX_SECONDS = float(os.getenv("LLM_BACKOFF_MAX_SECONDS", "8"))
+LLM_DEADLINE_SECONDS = float(os.getenv("LLM_DEADLINE_SECONDS", "60"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# Telemetry: per-stage spans (wall time, tokens, prompt size, cache hits) exported to comma-separated sinks
+# ("memory" feeds the admin panel, "jsonl" appends to TELEMETRY_JSONL_PATH, "prometheus" serves METRICS_PORT/metrics)
+TELEMETRY_SINKS = os.getenv("TELEMETRY_SINKS", "memory")
+TELEMETRY_JSONL_PATH = os.getenv("TELEMETRY_JSONL_PATH", "telemetry.jsonl")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))  # 0 = no metrics endpoint; set, it implies the prometheus sink
+ADMIN_PANEL = os.getenv("ADMIN_PANEL", "0") == "1"  # recent span stats in the sidebar
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+
+# Semantic cache for generated questions: a new candidate whose question context (template question,
+# last answer, profile, resume excerpts) is this similar to an earlier one gets that question without an LLM call
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0") == "1"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))  # cosine similarity
+SEMANTIC_CACHE_SIZE = int(os.getenv("SEMANTIC_CACHE_SIZE", "500"))  # entries per (domain, question) partition
+SEMANTIC_CACHE_TTL_SECONDS = float(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", str(24 * 3600)))
+
+# Question banks: question_banks/<domain>.jsonl (thousands of tagged questions) with a memory-mapped
+# embedding index built by `python question_bank_mvp.py build`. Each turn the bank question closest to
+# the candidate's resume/JD/profile and recent answers is picked; domains without a bank use DOMAIN_TEMPLATES
+QUESTION_BANK_DIR = os.getenv("QUESTION_BANK_DIR", "question_banks")
+QUESTION_BANK_RECENT_ANSWERS = int(os.getenv("QUESTION_BANK_RECENT_ANSWERS", "3"))  # answers mixed into the query
+QUESTION_BANK_CANDIDATES = int(os.getenv("QUESTION_BANK_CANDIDATES", "50"))  # shortlist re-ranked against asked questions
+QUESTION_BANK_REPEAT_PENALTY = float(os.getenv("QUESTION_BANK_REPEAT_PENALTY", "0.5"))
+QUESTION_BANK_TOPIC_PENALTY = float(os.getenv("QUESTION_BANK_TOPIC_PENALTY", "0.1"))  # per share of topics already covered
+
 # Domain Q&A Templates
 DOMAIN_TEMPLATES = {
     "engineering": {
@@ -25,7 +103,24 @@ DOMAIN_TEMPLATES = {
             "What's your experience with CI/CD pipelines and DevOps?",
             "How do you approach learning new technologies or frameworks?",
             "Describe a challenging technical problem you solved and how you approached it.",
-        ]
+        ],
+        "keywords": [
+            "architecture", "scalability", "latency", "throughput", "database", "cache", "api", "microservices",
+            "testing", "monitoring", "logging", "debugging", "trade-off", "refactor", "code review", "ci/cd",
+            "deployment", "performance", "profiling", "reliability", "incident", "design", "queue", "load balancer",
+        ],
+        "reference_answers": [
+            "I designed a service split into API, queue and worker tiers, chose the database for the access pattern, added caching and monitoring, and explained the scalability and consistency trade-offs.",
+            "I start from monitoring and logs, reproduce the issue, narrow it down with a hypothesis, ship a safe fix or rollback, then write a postmortem and add tests and alerts.",
+            "SQL databases give schemas, joins and transactions; NoSQL stores trade those for flexible schemas and horizontal scale. I pick based on access patterns and consistency needs.",
+            "Microservices give independent deployment and scaling but add network latency, distributed failures and operational overhead, so I split services along clear domain boundaries.",
+            "I keep functions small and well named, write tests, rely on code review and linters, document decisions, and refactor continuously.",
+            "I track technical debt in the backlog, estimate its cost, and reserve capacity each sprint to pay down the items that slow the team most.",
+            "I profiled a slow endpoint, found an N+1 database query, added batching and a cache, and cut p95 latency from 800 ms to 120 ms.",
+            "I built CI/CD pipelines that run tests and static checks on every commit, build images, and deploy with canary releases and automated rollback.",
+            "I read the documentation, build a small project, study how others use it in production, and share what I learned with the team.",
+            "I broke a hard problem into smaller parts, measured the bottleneck, evaluated alternatives and their trade-offs, and verified the fix with tests and metrics.",
+        ],
     },
     "management": {
         "name": "Management",
@@ -41,7 +136,24 @@ DOMAIN_TEMPLATES = {
             "Describe a situation where you had to make a tough call between business needs and team wellbeing.",
             "What metrics do you use to measure team performance and success?",
             "Tell me about your experience with cross-functional collaboration and coordination.",
-        ]
+        ],
+        "keywords": [
+            "team", "feedback", "one-on-one", "goals", "okr", "metrics", "stakeholder", "delegate", "hiring",
+            "coaching", "mentoring", "conflict", "priorities", "roadmap", "decision", "trust", "accountability",
+            "retention", "performance review", "communication", "alignment", "collaboration",
+        ],
+        "reference_answers": [
+            "I led a team of eight engineers, owned hiring, delivery and career growth, and set quarterly goals with the product stakeholders.",
+            "I adapt my style to each person, set clear goals, give regular feedback in one-on-ones, and recognize good work to keep the team motivated.",
+            "I had to cancel a delayed project; I gathered data, consulted stakeholders, explained the decision openly and moved the team to higher priority work.",
+            "I listen to both sides privately, find the shared goal, agree on concrete next steps, and follow up to make sure the conflict is resolved.",
+            "I set clear expectations, give timely specific feedback, document progress, and use improvement plans with support when needed.",
+            "I managed a difficult executive by understanding their priorities, bringing data, proposing options and keeping them informed early.",
+            "I build growth plans with each person, offer stretch assignments, mentoring and training, and give them visibility.",
+            "When a deadline threatened burnout I renegotiated scope with stakeholders, protecting the team while still delivering the key business goals.",
+            "I combine delivery metrics like cycle time and quality with outcome metrics, team health surveys and retention.",
+            "I aligned engineering, product and sales on shared goals with regular syncs, clear owners and written decisions.",
+        ],
     },
     "hr": {
         "name": "Human Resources",
@@ -57,8 +169,61 @@ DOMAIN_TEMPLATES = {
             "Describe your approach to diversity, equity, and inclusion initiatives.",
             "What's your experience with organizational change management?",
             "Tell me about a time you improved an HR process or policy. What was the outcome?",
-        ]
+        ],
+        "keywords": [
+            "recruitment", "hiring", "onboarding", "culture", "engagement", "retention", "employee relations",
+            "compensation", "benefits", "policy", "compliance", "performance", "feedback", "diversity", "inclusion",
+            "training", "development", "change management", "survey", "investigation", "confidential", "wellbeing",
+        ],
+        "reference_answers": [
+            "I have worked across recruitment, onboarding, employee relations, compensation and learning and development in growing companies.",
+            "I define the role with the hiring manager, use structured interviews and clear criteria, and build a diverse pipeline and a good candidate experience.",
+            "I foster culture through clear values, recognition, engagement surveys followed by action, and leaders who model the behaviour.",
+            "I investigated a complaint confidentially and fairly, documented the facts, followed policy, and agreed a resolution that restored trust.",
+            "I build development plans with managers, offer training and mentoring, and make career paths and promotion criteria transparent.",
+            "I benchmarked compensation against the market, built salary bands, and balanced benefits, budget and internal equity.",
+            "I prepare with the facts, have the conversation privately and respectfully, set clear expectations and follow up with support.",
+            "I use data to find gaps, set inclusive hiring and promotion practices, support employee resource groups and track progress.",
+            "I led change by explaining the why, involving employees early, training managers, communicating often and measuring adoption.",
+            "I streamlined the onboarding process with a checklist and automation, cutting time to productivity and improving new hire survey scores.",
+        ],
     }
 }
 
 NUM_QUESTIONS = 10
+
+# Conversation memory fed to generate_question: last N turns verbatim, older turns summarized
+MEMORY_RECENT_TURNS = int(os.getenv("MEMORY_RECENT_TURNS", "3"))
+MEMORY_TOKEN_BUDGET = int(os.getenv("MEMORY_TOKEN_BUDGET", "1500"))
+
+# Upload extraction: in-memory, size-limited, page-parallel for large PDFs, cached by file hash
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(5 * 1024 * 1024)))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "40"))
+PARALLEL_PDF_MIN_PAGES = int(os.getenv("PARALLEL_PDF_MIN_PAGES", "8"))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "4"))
+EXTRACTION_TIMEOUT_SECONDS = float(os.getenv("EXTRACTION_TIMEOUT_SECONDS", "20"))  # per document; the pool is replaced on timeout
+EXTRACTION_CACHE_SIZE = int(os.getenv("EXTRACTION_CACHE_SIZE", "128"))
+
+# Resume/JD retrieval: documents are chunked at ingest and the top-k chunks are injected per question
+CHUNK_WORDS = int(os.getenv("CHUNK_WORDS", "120"))
+CHUNK_OVERLAP_WORDS = int(os.getenv("CHUNK_OVERLAP_WORDS", "30"))
+RETRIEVAL_TOP_K = int(os.getenv("RETRIEVAL_TOP_K", "4"))
+
+# Vector store: persistent on disk (set CHROMA_PATH="" for in-memory), stale candidates expire after a TTL
+CHROMA_PATH = os.getenv("CHROMA_PATH", ".cache/chroma")
+# Defaults to SESSION_TTL_HOURS: a resumable interview must still find its candidate's chunks
+CANDIDATE_TTL_HOURS = float(os.getenv("CANDIDATE_TTL_HOURS", os.getenv("SESSION_TTL_HOURS", "72")))
+GC_INTERVAL_SECONDS = float(os.getenv("GC_INTERVAL_SECONDS", "600"))
+CANDIDATE_TOUCH_SECONDS = float(os.getenv("CANDIDATE_TOUCH_SECONDS", "3600"))  # how often an active session refreshes last_seen
+
+# Local answer scoring (no LLM call): keyword/length/structure signals, plus embedding similarity
+# to the question and the domain's reference answers unless SCORING_EMBEDDINGS=0
+SCORING_EMBEDDINGS = os.getenv("SCORING_EMBEDDINGS", "1") == "1"
+
+# Interview session store ("sqlite" survives restarts and is shared by every worker on the host,
+# "memory" is per process); the session ID travels in the ?sid= URL parameter so an interview can be resumed
+SESSION_STORE = os.getenv("SESSION_STORE", "sqlite")
+SESSION_DB_PATH = os.getenv("SESSION_DB_PATH", ".cache/sessions.db")
+SESSION_FLUSH_SECONDS = float(os.getenv("SESSION_FLUSH_SECONDS", "0.25"))  # write-behind interval
+SESSION_BATCH_SIZE = int(os.getenv("SESSION_BATCH_SIZE", "64"))  # flush early once this many sessions are pending
+SESSION_TTL_HOURS = float(os.getenv("SESSION_TTL_HOURS", "72"))  # also the default CANDIDATE_TTL_HOURS
@@ -0,0 +1,202 @@
+"""
+Content-addressed embedding cache backed by a memory-mapped NumPy array on disk
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+
+import config_mvp as config
+
+try:
+    import fcntl
+except ImportError:  # Windows: single-process use only
+    fcntl = None
+
+EMPTY = b""
+
+
+class EmbeddingCache:
+    """
+    Maps sha256(model name + text) to an embedding row, so re-ingesting the same document is a
+    hash lookup instead of a forward pass. Rows live in a fixed-size memory-mapped .npy file
+    (`capacity` rows); a second memory-mapped .keys.npy holds each row's key and is the index, and
+    a .meta.npy holds a write generation (slot 0) and each row's last access time in ms.
+    Every worker process on the host maps the same files: rows are only written under an exclusive
+    file lock and each write bumps the generation, so a process only re-reads the index after another
+    one changed it. Empty rows are filled first, then the least recently used rows are evicted; a hit
+    is only trusted if the row still carries its key after the vector was copied out.
+    With directory="" the rows are kept in RAM only.
+    """
+
+    def __init__(self, model_name: str, directory: str = None, capacity: int = None):
+        self.model_name = model_name
+        self.directory = config.EMBEDDING_CACHE_DIR if directory is None else directory
+        self.capacity = capacity or config.EMBEDDING_CACHE_SIZE
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._slots = {}  # key -> row: this process's view of the keys file, verified on every hit
+        self._generation = -1  # generation _slots was read at
+        self._vectors = None
+        self._keys = None
+        self._meta = None
+        self.dim = None
+        if self.directory:
+            safe_name = "".join(c if c.isalnum() or c in "-_." else "_" for c in model_name)
+            os.makedirs(self.directory, exist_ok=True)
+            self._array_path = os.path.join(self.directory, f"{safe_name}.npy")
+            self._keys_path = os.path.join(self.directory, f"{safe_name}.keys.npy")
+            self._meta_path = os.path.join(self.directory, f"{safe_name}.meta.npy")
+            self._lock_path = os.path.join(self.directory, f"{safe_name}.lock")
+            self._open()
+
+    def key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode("utf-8")).hexdigest()
+
+    @property
+    def _stamps(self):
+        return self._meta[1:]
+
+    def _open(self):
+        """Map the files another process (or an earlier run) created, if any"""
+        if not all(os.path.exists(path) for path in (self._array_path, self._keys_path, self._meta_path)):
+            return
+        try:
+            vectors = np.load(self._array_path, mmap_mode="r+")
+            keys = np.load(self._keys_path, mmap_mode="r+")
+            meta = np.load(self._meta_path, mmap_mode="r+")
+            if vectors.ndim != 2 or keys.shape != (vectors.shape[0],) or meta.shape != (vectors.shape[0] + 1,):
+                raise ValueError("vectors, keys and meta files don't match")
+        except (OSError, ValueError) as e:
+            logging.warning(f"Ignoring unreadable embedding cache: {e}")
+            return
+        self._vectors, self._keys, self._meta = vectors, keys, meta
+        self.dim = vectors.shape[1]
+        self.capacity = vectors.shape[0]
+        self._refresh()
+
+    def _refresh(self, force: bool = True):
+        """Re-read the key -> row index if another process added or evicted rows since we last read it"""
+        if self._keys is None:
+            return
+        generation = int(self._meta[0])
+        if force or generation != self._generation:
+            self._slots = {key.decode("ascii"): row for row, key in enumerate(self._keys.tolist()) if key}
+            self._generation = generation
+
+    @contextmanager
+    def _file_lock(self):
+        if not self.directory or fcntl is None:
+            yield
+            return
+        with open(self._lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _allocate(self, dim: int):
+        """Create the arrays (called under the file lock, after _open found nothing); meta last, _open needs all three"""
+        self.dim = dim
+        if self.directory:
+            self._vectors = np.lib.format.open_memmap(
+                self._array_path, mode="w+", dtype=np.float32, shape=(self.capacity, dim)
+            )
+            self._keys = np.lib.format.open_memmap(self._keys_path, mode="w+", dtype="S64", shape=(self.capacity,))
+            self._meta = np.lib.format.open_memmap(self._meta_path, mode="w+", dtype=np.int64, shape=(self.capacity + 1,))
+        else:
+            self._vectors = np.zeros((self.capacity, dim), dtype=np.float32)
+            self._keys = np.zeros(self.capacity, dtype="S64")
+            self._meta = np.zeros(self.capacity + 1, dtype=np.int64)
+        self._slots = {}
+        self._generation = 0
+
+    def _lookup(self, keys: list) -> dict:
+        """{key: vector copy} for the keys whose row still holds them; stamps the rows as just used"""
+        found = {}
+        now = int(time.time() * 1000)
+        for key in keys:
+            row = self._slots.get(key)
+            if row is None or key in found:
+                continue
+            encoded = key.encode("ascii")
+            vector = np.array(self._vectors[row])
+            if self._keys[row] == encoded:
+                found[key] = vector
+                self._stamps[row] = now  # unlocked: a lost update only makes eviction slightly less exact
+            else:
+                del self._slots[key]  # evicted by another process
+        return found
+
+    def _store(self, new_vectors: dict):
+        """Write {key: vector} rows under the file lock, into empty rows first, then least recently used ones"""
+        with self._file_lock():
+            if self._vectors is None and self.directory:
+                self._open()
+            if self._vectors is None:
+                self._allocate(len(next(iter(new_vectors.values()))))
+            self._refresh(force=False)
+            pending = [key for key in new_vectors if key not in self._slots][:self.capacity]
+            if not pending:
+                return
+            stamps = self._stamps
+            # Empty rows have stamp 0, so they go first
+            rows = np.argpartition(stamps, len(pending) - 1)[:len(pending)].tolist() if len(pending) < self.capacity \
+                else list(range(self.capacity))
+            now = int(time.time() * 1000)
+            for key, row in zip(pending, rows):
+                evicted = self._keys[row]
+                if evicted:
+                    self._slots.pop(evicted.decode("ascii"), None)
+                # Blank the key first, so a concurrent reader never trusts a half-written row
+                self._keys[row] = EMPTY
+                self._vectors[row] = new_vectors[key]
+                self._keys[row] = key.encode("ascii")
+                stamps[row] = now
+                self._slots[key] = row
+            self._meta[0] += 1
+            self._generation = int(self._meta[0])
+
+    def flush(self):
+        """Persist the memory maps (the OS writes them back anyway; this forces it)"""
+        if self.directory and self._vectors is not None:
+            self._vectors.flush()
+            self._keys.flush()
+            self._meta.flush()
+
+    def encode(self, encoder, texts: list):
+        """encoder.encode(texts), but only the texts not already cached go through the model"""
+        keys = [self.key(text) for text in texts]
+        with self._lock:
+            if self._vectors is None and self.directory:
+                self._open()  # another worker may have created the cache meanwhile
+            if self._vectors is not None:
+                self._refresh(force=False)  # cheap unless another worker wrote since
+            found = self._lookup(keys) if self._vectors is not None else {}
+            missing = [(key, text) for key, text in zip(keys, texts) if key not in found]
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+        if missing:
+            unique_missing = dict(missing)
+            new_vectors = encoder.encode(list(unique_missing.values()))
+            new_vectors = {key: np.asarray(vector, dtype=np.float32) for key, vector in zip(unique_missing, new_vectors)}
+            found.update(new_vectors)
+            with self._lock:
+                self._store(new_vectors)
+        return np.stack([found[key] for key in keys]) if keys else np.zeros((0, self.dim or 0), dtype=np.float32)
+
+    def stats(self) -> dict:
+        looked_up = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / looked_up, 3) if looked_up else None,
+            "entries": int((self._keys != EMPTY).sum()) if self._keys is not None else 0,
+            "capacity": self.capacity,
+        }
@@ -0,0 +1,165 @@
+"""
+In-process micro-batching embedding service shared by every session: concurrent encode() calls are
+queued and coalesced into one forward pass on a dedicated worker thread
+"""
+import time
+import queue
+import bisect
+import logging
+import threading
+from concurrent.futures import Future
+
+import config_mvp as config
+from telemetry_mvp import span
+
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+LATENCY_MS_BUCKETS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+
+
+class Histogram:
+    """Fixed-bucket counts (value <= bound), Prometheus style, plus count and sum"""
+
+    def __init__(self, bounds: tuple):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket: above every bound
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> dict:
+        labels = [f"<={bound:g}" for bound in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "buckets": {label: count for label, count in zip(labels, self.counts) if count},
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else None,
+        }
+
+
+class _Request:
+    __slots__ = ("texts", "future", "enqueued")
+
+    def __init__(self, texts: list):
+        self.texts = texts
+        self.future = Future()
+        self.enqueued = time.perf_counter()
+
+
+class EmbeddingService:
+    """
+    Drop-in for SentenceTransformer.encode: encode(texts) blocks until the worker has embedded them.
+    The worker takes the first queued request, keeps collecting requests for up to `window_ms`
+    (or until `max_batch` texts are gathered) and runs a single model.encode over all of them,
+    so many candidates uploading at once cost a few large forward passes instead of many tiny
+    ones fighting over the same cores. A request larger than `max_batch` is encoded on its own.
+    model_provider is a zero-arg callable (the shared encoder). It is called once, here on the caller's
+    thread, so the worker never waits on the resource registry (whose locks an encode() caller may hold).
+    """
+
+    def __init__(self, model_provider, window_ms: float = None, max_batch: int = None, torch_threads: int = None):
+        self.model = model_provider()
+        self.window_seconds = (config.EMBEDDING_BATCH_WINDOW_MS if window_ms is None else window_ms) / 1000
+        self.max_batch = max_batch or config.EMBEDDING_MAX_BATCH
+        self.torch_threads = config.EMBEDDING_TORCH_THREADS if torch_threads is None else torch_threads
+        self._queue = queue.Queue()
+        self._carry = None  # request that didn't fit into the previous batch
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Histogram(BATCH_SIZE_BUCKETS)
+        self.requests_per_batch = Histogram(BATCH_SIZE_BUCKETS)
+        self.queue_wait_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.encode_ms = Histogram(LATENCY_MS_BUCKETS)
+        self.failures = 0
+        self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+        self._worker.start()
+
+    def encode(self, texts: list, batch_size: int = None, **kwargs):
+        """Embeddings for `texts` as a float32 (len(texts), dim) array; batch_size/kwargs are accepted and ignored"""
+        import numpy as np
+        texts = list(texts)
+        if not texts:
+            return np.zeros((0, 0), dtype=np.float32)
+        request = _Request(texts)
+        self._queue.put(request)
+        return request.future.result()
+
+    # --- worker ---
+
+    def _next_batch(self) -> list:
+        """Block for the first request, then gather more until the window closes or the batch is full"""
+        first = self._carry if self._carry is not None else self._queue.get()
+        self._carry = None
+        if first is None:
+            return None
+        batch, size = [first], len(first.texts)
+        deadline = time.perf_counter() + self.window_seconds
+        while size < self.max_batch:
+            remaining = deadline - time.perf_counter()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None or size + len(request.texts) > self.max_batch:
+                self._carry = request  # starts the next batch (or stops the worker)
+                break
+            batch.append(request)
+            size += len(request.texts)
+        return batch
+
+    def _run(self):
+        if self.torch_threads > 0:
+            try:
+                import torch
+                torch.set_num_threads(self.torch_threads)
+            except ImportError:
+                pass
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: list):
+        import numpy as np
+        texts = [text for request in batch for text in request.texts]
+        started = time.perf_counter()
+        try:
+            with span("embedding_batch", texts=len(texts), requests=len(batch)):
+                vectors = np.asarray(self.model.encode(texts, batch_size=self.max_batch), dtype=np.float32)
+        except Exception as e:
+            logging.warning(f"Embedding batch of {len(texts)} texts failed: {e}")
+            with self._stats_lock:
+                self.failures += 1
+            for request in batch:
+                request.future.set_exception(e)
+            return
+        encode_ms = (time.perf_counter() - started) * 1000
+        offset = 0
+        for request in batch:
+            request.future.set_result(vectors[offset:offset + len(request.texts)])
+            offset += len(request.texts)
+        with self._stats_lock:
+            self.batch_sizes.observe(len(texts))
+            self.requests_per_batch.observe(len(batch))
+            self.encode_ms.observe(encode_ms)
+            for request in batch:
+                self.queue_wait_ms.observe((started - request.enqueued) * 1000)
+
+    def close(self):
+        """Stop the worker once the queued requests are done"""
+        self._queue.put(None)
+
+    def stats(self) -> dict:
+        with self._stats_lock:
+            return {
+                "batches": self.batch_sizes.count,
+                "texts": round(self.batch_sizes.total),
+                "failures": self.failures,
+                "queued": self._queue.qsize(),
+                "batch_size": self.batch_sizes.snapshot(),
+                "requests_per_batch": self.requests_per_batch.snapshot(),
+                "queue_wait_ms": self.queue_wait_ms.snapshot(),
+                "encode_ms": self.encode_ms.snapshot(),
+            }
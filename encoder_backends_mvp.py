@@ -0,0 +1,95 @@
+"""
+Encoder backends: the same MiniLM model and encode() interface on different CPU runtimes.
+
+    fp32       sentence-transformers on torch (default)
+    int8       the same torch model with its Linear layers dynamically quantized to int8
+    onnx       the model's exported ONNX graph on onnxruntime + tokenizers, without importing torch
+    onnx-int8  the exported graph quantized to uint8 (onnx/model_quint8_avx2.onnx in the model repo)
+
+The onnx backends need `pip install onnxruntime`; tokenizers and huggingface_hub come with sentence-transformers.
+Compare them with `python bench_mvp.py --stages encoder_backends`.
+"""
+import config_mvp as config
+
+ONNX_FILES = {"onnx": "onnx/model.onnx", "onnx-int8": "onnx/model_quint8_avx2.onnx"}
+
+
+def encoder_id(backend: str = None) -> str:
+    """Model + backend, for everything that stores vectors (embedding cache, question bank index, vector store):
+    vectors of different backends are close but not identical, so they must never be mixed"""
+    backend = backend or config.EMBEDDING_BACKEND
+    return config.EMBEDDING_MODEL if backend == "fp32" else f"{config.EMBEDDING_MODEL}-{backend}"
+
+
+def _hub_repo(model_name: str) -> str:
+    return model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+
+
+class OnnxEncoder:
+    """
+    SentenceTransformer.encode for a MiniLM ONNX export: tokenize, run the graph, mean-pool the token
+    embeddings over the attention mask and L2-normalize (the model's own pooling + Normalize modules).
+    """
+
+    def __init__(self, model_name: str, onnx_file: str, max_seq_length: int = 256, threads: int = 0):
+        import onnxruntime
+        from tokenizers import Tokenizer
+        from huggingface_hub import hf_hub_download
+        repo = _hub_repo(model_name)
+        self.tokenizer = Tokenizer.from_file(hf_hub_download(repo, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=max_seq_length)
+        self.tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+        options = onnxruntime.SessionOptions()
+        if threads > 0:
+            options.intra_op_num_threads = threads
+        self.session = onnxruntime.InferenceSession(
+            hf_hub_download(repo, onnx_file), options, providers=["CPUExecutionProvider"]
+        )
+        self.input_names = {model_input.name for model_input in self.session.get_inputs()}
+
+    def encode(self, texts: list, batch_size: int = 32, **kwargs):
+        import numpy as np
+        texts = list(texts)
+        batches = []
+        for start in range(0, len(texts), batch_size):
+            encodings = self.tokenizer.encode_batch(texts[start:start + batch_size])
+            mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+            inputs = {
+                "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+                "attention_mask": mask,
+                "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+            }
+            tokens = self.session.run(None, {name: value for name, value in inputs.items() if name in self.input_names})[0]
+            pooled = (tokens * mask[:, :, None]).sum(axis=1) / np.maximum(mask.sum(axis=1, keepdims=True), 1)
+            batches.append(pooled / np.maximum(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12))
+        return np.concatenate(batches).astype(np.float32) if batches else np.zeros((0, 0), dtype=np.float32)
+
+
+def _load_fp32(model_name: str):
+    # sentence_transformers pulls in torch (seconds of import time), so it is only imported here
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def _load_int8(model_name: str):
+    import torch
+    from sentence_transformers import SentenceTransformer
+    model = SentenceTransformer(model_name, device="cpu")
+    # int8 weights, activations quantized on the fly; in place so the fp32 Linear weights are released
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+BACKENDS = {
+    "fp32": _load_fp32,
+    "int8": _load_int8,
+    "onnx": lambda model_name: OnnxEncoder(model_name, ONNX_FILES["onnx"], threads=config.EMBEDDING_TORCH_THREADS),
+    "onnx-int8": lambda model_name: OnnxEncoder(model_name, ONNX_FILES["onnx-int8"], threads=config.EMBEDDING_TORCH_THREADS),
+}
+
+
+def create_encoder(backend: str = None, model_name: str = None):
+    """Encoder for the configured EMBEDDING_BACKEND (see BACKENDS)"""
+    backend = backend or config.EMBEDDING_BACKEND
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown EMBEDDING_BACKEND {backend!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[backend](model_name or config.EMBEDDING_MODEL)
@@ -0,0 +1,340 @@
+"""
+Headless interview engine: the interview state machine without any Streamlit code,
+so the same flow can be driven by the web UI, a CLI, an HTTP API or a load generator
+"""
+import json
+import uuid
+import hashlib
+import functools
+
+import config_mvp as config
+from agent_mvp import UserSession
+from memory_mvp import ConversationMemory
+from retrieval_mvp import build_query
+from summary_mvp import InterviewSummary
+
+PAGES = ("domain", "interview", "summary")
+
+
+class InterviewSession:
+    """
+    One candidate's interview: domain -> interview (question_num 1..N) -> summary.
+    All state is plain data (see to_dict/from_dict). The agent, retriever, prefetcher and assessor are
+    process-level collaborators attached at runtime and never serialized.
+    """
+
+    def __init__(self, user_id: str = None, agent_provider=None, retriever=None, prefetcher=None, assessor=None):
+        self.user_id = user_id or uuid.uuid4().hex
+        self.page = "domain"
+        self.domain = None
+        self.question_num = 1
+        self.qa_list = []
+        self.current_question = None
+        self.resume_text = ""
+        self.jobdesc_text = ""
+        self.profile_text = ""
+        self.user = UserSession(self.user_id)
+        self.memory = ConversationMemory()
+        self.assessments = []  # background per-answer assessments, aligned with qa_list (None = not available)
+        self.bank_questions = []  # {'id', 'q'} picked from the question bank per question_num (empty without a bank)
+        self.summary_cache = None  # {'key': ..., 'summary': InterviewSummary.to_dict()}
+        self.attach(agent_provider, retriever, prefetcher, assessor)
+
+    def attach(self, agent_provider=None, retriever=None, prefetcher=None, assessor=None):
+        """(Re)attach runtime collaborators, e.g. after from_dict.
+        agent_provider(domain) -> InterviewerAgent; retriever(user_id, query) -> passages;
+        assessor: AnswerAssessor for the map-reduce summary (optional)."""
+        if agent_provider is None:
+            import resources_mvp as resources
+            agent_provider = resources.get_agent
+        self.agent_provider = agent_provider
+        self.retriever = retriever
+        self.prefetcher = prefetcher
+        self.assessor = assessor
+        return self
+
+    # --- state helpers ---
+
+    @property
+    def agent(self):
+        return self.agent_provider(self.domain)
+
+    @property
+    def profile(self) -> dict:
+        return self.user.profile
+
+    def update_profile(self, profile: dict):
+        self.user.update_profile(profile)
+
+    def template_question(self, question_num: int = None) -> str:
+        index = (question_num or self.question_num) - 1
+        if 0 <= index < len(self.bank_questions):
+            return self.bank_questions[index]['q']
+        questions = config.DOMAIN_TEMPLATES[self.domain]["questions"]
+        return questions[index] if 0 <= index < len(questions) else ""
+
+    def _pick_bank_question(self, question_num: int, answers: list):
+        """Bank question `question_num` for this candidate as {'id', 'q'}, None without a bank (falls back to the template)"""
+        agent = self.agent
+        if agent.question_bank is None:
+            return None
+        question = agent.select_template_question(
+            self.user,
+            [picked['id'] for picked in self.bank_questions],
+            self.resume_text,
+            self.jobdesc_text,
+            answers[-config.QUESTION_BANK_RECENT_ANSWERS:] if config.QUESTION_BANK_RECENT_ANSWERS > 0 else []
+        )
+        return question.to_dict() if question is not None else {'id': None, 'q': self.template_question(question_num)}
+
+    def select_question(self):
+        """Fix the template question for the current question_num (a no-op once picked, or without a bank)"""
+        if len(self.bank_questions) >= self.question_num:
+            return
+        picked = self._pick_bank_question(self.question_num, [qa['a'] for qa in self.qa_list])
+        if picked is not None:
+            self.bank_questions.append(picked)
+
+    @property
+    def finished(self) -> bool:
+        return self.page == "summary"
+
+    # --- transitions ---
+
+    def reset(self, page: str = "domain"):
+        """Back to question 1 (Home / New Interview -> "domain", Restart -> "interview"), keeping the profile"""
+        if page not in PAGES:
+            raise ValueError(f"Unknown page {page!r}")
+        profile = dict(self.user.profile)
+        self.page = page
+        self.question_num = 1
+        self.qa_list = []
+        self.current_question = None
+        self.user = UserSession(self.user_id)
+        self.user.update_profile(profile)
+        self.memory = ConversationMemory()
+        self.assessments = []
+        self.bank_questions = []
+        self.summary_cache = None
+        if self.prefetcher is not None:
+            self.prefetcher.discard()
+        if self.assessor is not None:
+            self.assessor.discard()
+
+    def start(self, domain: str, profile: dict = None, resume_text: str = "", jobdesc_text: str = "",
+              profile_text: str = ""):
+        """Begin a fresh interview in `domain` with already-extracted resume/JD text"""
+        if domain not in config.DOMAIN_TEMPLATES:
+            raise ValueError(f"Unknown interview domain {domain!r}")
+        self.domain = domain
+        self.reset("interview")
+        if profile:
+            self.update_profile(profile)
+        self.resume_text = resume_text or ""
+        self.jobdesc_text = jobdesc_text or ""
+        self.profile_text = profile_text or ""
+
+    def _context_loader(self, template_question: str, last_answer: str = ""):
+        """Zero-arg callable fetching resume/JD passages, or None when there is nothing to retrieve from"""
+        if self.retriever is None or not (self.resume_text or self.jobdesc_text):
+            return None
+        return functools.partial(self.retriever, self.user_id, build_query(template_question, last_answer))
+
+    def stream_next_question(self):
+        """Yield the current question's text; generated (and streamed) only if it doesn't exist yet"""
+        if self.page != "interview":
+            raise RuntimeError(f"No question to ask on the {self.page!r} page")
+        if self.current_question is None:
+            self.select_question()
+            last_answer = self.qa_list[-1]['a'] if self.qa_list else ""
+            loader = self._context_loader(self.template_question(), last_answer)
+            question = ""
+            for chunk in self.agent.stream_question(
+                self.user,
+                self.question_num,
+                self.memory.render(),
+                self.resume_text,
+                self.jobdesc_text,
+                loader() if loader is not None else None,
+                self.template_question()
+            ):
+                question += chunk
+                yield chunk
+            self.current_question = question
+        else:
+            yield self.current_question
+        self.prefetch_next()
+
+    def next_question(self) -> str:
+        """The current question, generating it if needed"""
+        for _ in self.stream_next_question():
+            pass
+        return self.current_question
+
+    def prefetch_next(self):
+        """Start speculative generation of the following question (no-op without a prefetcher)"""
+        if self.prefetcher is None or self.page != "interview" or self.question_num >= config.NUM_QUESTIONS:
+            return
+        # Speculative pick for the next question: the current answer isn't known yet
+        picked = self._pick_bank_question(self.question_num + 1, [qa['a'] for qa in self.qa_list])
+        next_template = picked['q'] if picked is not None else self.template_question(self.question_num + 1)
+        self.prefetcher.start(
+            self.agent,
+            self.user,
+            self.question_num,
+            self.template_question(),
+            self.memory.render(),
+            self.resume_text,
+            self.jobdesc_text,
+            self._context_loader(next_template),
+            next_template
+        )
+
+    def answer(self, text: str) -> bool:
+        """Record the answer to the current question and advance; returns True when the interview is over"""
+        if self.page != "interview":
+            raise RuntimeError(f"Can't answer on the {self.page!r} page")
+        if not text.strip():
+            raise ValueError("Please provide an answer")
+        q_text = self.template_question()
+        self.qa_list.append({'q': q_text, 'a': text})
+        self.assessments.append(None)
+        self.user.record_response(q_text, text)
+        if self.assessor is not None:
+            # Map step of the summary, while the candidate moves on to the next question
+            self.assessor.submit(self.agent, self.user, len(self.qa_list) - 1, q_text, text)
+        conversation_before_answer = self.memory.render()
+        self.memory.add_turn(q_text, text)
+
+        if self.question_num >= config.NUM_QUESTIONS:
+            self.page = "summary"
+            return True
+        # Next question (reuse the speculative one if it is ready, else regenerate)
+        self.question_num += 1
+        self.current_question = None
+        if self.prefetcher is not None:
+            self.select_question()
+            self.current_question = self.prefetcher.take(
+                self.domain,
+                self.question_num,
+                conversation_before_answer,
+                config.PREFETCH_WAIT_SECONDS,
+                self.template_question(),
+                text,
+                q_text
+            )
+        return False
+
+    # --- summary ---
+
+    def summary_cache_key(self) -> str:
+        """The summary only depends on domain + Q&A + profile, so reruns reuse it"""
+        payload = json.dumps({
+            "domain": self.domain,
+            "qa_list": self.qa_list,
+            "profile": self.user.profile,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def cached_summary(self):
+        """The InterviewSummary for the current Q&A if it was already generated, else None"""
+        if self.summary_cache is not None and self.summary_cache['key'] == self.summary_cache_key():
+            cached = self.summary_cache['summary']
+            # Sessions saved before structured summaries hold the plain text
+            return InterviewSummary.from_text(cached) if isinstance(cached, str) else InterviewSummary.from_dict(cached)
+        return None
+
+    def collect_assessments(self) -> list:
+        """Per-answer assessments finished in the background (waiting briefly for stragglers)"""
+        self.assessments = (self.assessments + [None] * len(self.qa_list))[:len(self.qa_list)]
+        if self.assessor is not None:
+            for index, assessment in self.assessor.collect(config.ASSESSMENT_WAIT_SECONDS).items():
+                if index < len(self.assessments):
+                    self.assessments[index] = assessment
+        return self.assessments
+
+    def stream_summary(self):
+        """Yield InterviewSummary snapshots while the summary streams in (the last one is final);
+        generated only when the Q&A changed since the last call. Answers assessed in the background
+        are reduced from their assessments; the others are summarized from the full answer."""
+        cached = self.cached_summary()
+        if cached is not None:
+            yield cached
+            return
+        cache_key = self.summary_cache_key()
+        summary = None
+        for summary in self.agent.stream_summary(self.user, self.qa_list, self.collect_assessments()):
+            yield summary
+        self.summary_cache = {'key': cache_key, 'summary': summary.to_dict()}
+
+    def summary(self) -> InterviewSummary:
+        """The structured summary (sections + score) for the finished interview"""
+        for _ in self.stream_summary():
+            pass
+        return self.cached_summary()
+
+    # --- serialization ---
+
+    def to_dict(self) -> dict:
+        return {
+            'user_id': self.user_id,
+            'page': self.page,
+            'domain': self.domain,
+            'question_num': self.question_num,
+            'qa_list': self.qa_list,
+            'current_question': self.current_question,
+            'resume_text': self.resume_text,
+            'jobdesc_text': self.jobdesc_text,
+            'profile_text': self.profile_text,
+            'user': self.user.to_dict(),
+            'memory': self.memory.to_dict(),
+            'assessments': self.assessments,
+            'bank_questions': self.bank_questions,
+            'summary_cache': self.summary_cache,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict, agent_provider=None, retriever=None, prefetcher=None, assessor=None):
+        session = cls(data['user_id'], agent_provider, retriever, prefetcher, assessor)
+        session.page = data.get('page', "domain")
+        session.domain = data.get('domain')
+        session.question_num = data.get('question_num', 1)
+        session.qa_list = [dict(qa) for qa in data.get('qa_list', [])]
+        session.current_question = data.get('current_question')
+        session.resume_text = data.get('resume_text', "")
+        session.jobdesc_text = data.get('jobdesc_text', "")
+        session.profile_text = data.get('profile_text', "")
+        session.user = UserSession.from_dict(data['user']) if data.get('user') else UserSession(session.user_id)
+        session.memory = ConversationMemory.from_dict(data.get('memory', {}))
+        session.assessments = list(data.get('assessments', []))
+        session.bank_questions = [dict(picked) for picked in data.get('bank_questions', [])]
+        session.summary_cache = data.get('summary_cache')
+        return session
+
+
+if __name__ == "__main__":
+    # Drive an interview from the terminal: python engine_mvp.py hr [--auto]
+    # (LLM_PROVIDER=stub runs it fully offline)
+    import argparse
+    parser = argparse.ArgumentParser(description="Run an interview without the web UI")
+    parser.add_argument("domain", choices=sorted(config.DOMAIN_TEMPLATES))
+    parser.add_argument("--name", default="Candidate")
+    parser.add_argument("--background", default="")
+    parser.add_argument("--auto", action="store_true", help="answer every question with a canned answer")
+    args = parser.parse_args()
+    assessor = None
+    if config.MAP_REDUCE_SUMMARY:
+        import resources_mvp as resources
+        from assessment_mvp import AnswerAssessor
+        assessor = AnswerAssessor(resources.get_assessment_executor())
+    interview = InterviewSession(assessor=assessor)
+    interview.start(args.domain, {"name": args.name, "background": args.background})
+    while not interview.finished:
+        print(f"\nQ{interview.question_num}: ", end="", flush=True)
+        for chunk in interview.stream_next_question():
+            print(chunk, end="", flush=True)
+        print()
+        answer = "I would break the problem down, measure, and iterate." if args.auto else input("> ")
+        interview.answer(answer or "(no answer)")
+    result = interview.summary()
+    print(f"\n{result.to_markdown()}\n\nScore: {result.score}")
@@ -0,0 +1,116 @@
+"""
+In-memory text extraction for uploaded resumes / job descriptions (PDF or TXT)
+"""
+import io
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+
+import config_mvp as config
+from telemetry_mvp import span
+
+
+class ExtractionError(ValueError):
+    """The document was rejected (too large, too many pages) or couldn't be extracted in time"""
+
+
+_cache = OrderedDict()  # sha256(data) -> text, least recently used first
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: str):
+    with _cache_lock:
+        text = _cache.get(key)
+        if text is not None:
+            _cache.move_to_end(key)
+        return text
+
+
+def _cache_put(key: str, text: str):
+    with _cache_lock:
+        _cache[key] = text
+        _cache.move_to_end(key)
+        while len(_cache) > config.EXTRACTION_CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+def _count_pages(data: bytes) -> int:
+    """Runs in a worker process: the PDF's page count"""
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return len(pdf.pages)
+
+
+def _extract_page_range(data: bytes, start: int, end: int) -> str:
+    """Runs in a worker process: extract pages [start, end) straight from the PDF bytes"""
+    import pdfplumber
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        return "\n".join(page.extract_text() or "" for page in pdf.pages[start:end])
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """
+    All parsing happens in the extraction pool's worker processes under one deadline of
+    EXTRACTION_TIMEOUT_SECONDS for the whole document: page count, then one page range (small PDFs)
+    or one range per worker. On timeout the pool is retired (its busy workers exit once their page
+    range is done) and a fresh pool serves the next upload.
+    """
+    import resources_mvp as resources
+    deadline = time.monotonic() + config.EXTRACTION_TIMEOUT_SECONDS
+    pool = resources.get_extraction_pool()
+    futures = []
+    try:
+        futures.append(pool.submit(_count_pages, data))
+        num_pages = futures[0].result(timeout=max(0.0, deadline - time.monotonic()))
+        if num_pages > config.MAX_PDF_PAGES:
+            raise ExtractionError(f"PDF has {num_pages} pages, the limit is {config.MAX_PDF_PAGES}")
+        # Small PDF: one page range; large PDF: one range per worker, extracted in parallel
+        per_worker = num_pages if num_pages < config.PARALLEL_PDF_MIN_PAGES else -(-num_pages // config.EXTRACTION_WORKERS)
+        futures = [
+            pool.submit(_extract_page_range, data, start, min(start + per_worker, num_pages))
+            for start in range(0, num_pages, max(per_worker, 1))
+        ]
+        parts = [future.result(timeout=max(0.0, deadline - time.monotonic())) for future in futures]
+    except FutureTimeoutError:
+        for future in futures:
+            future.cancel()
+        resources.recycle_extraction_pool(pool)
+        raise ExtractionError(f"PDF text extraction took longer than {config.EXTRACTION_TIMEOUT_SECONDS:g}s")
+    except BrokenProcessPool:
+        # The pool was recycled under us (another upload timed out) or a worker crashed
+        resources.recycle_extraction_pool(pool)
+        raise ExtractionError("PDF text extraction was interrupted, please upload the file again")
+    return "\n".join(parts)
+
+
+def extract_text_from_bytes(data: bytes, mime_type: str) -> str:
+    """Extract text from an uploaded document's bytes; results are cached by content hash"""
+    if not data:
+        return ""
+    if len(data) > config.MAX_UPLOAD_BYTES:
+        raise ExtractionError(f"File is {len(data) / 1e6:.1f} MB, the limit is {config.MAX_UPLOAD_BYTES / 1e6:.1f} MB")
+    with span("extract_text", mime_type=mime_type, bytes=len(data)) as stage:
+        key = hashlib.sha256(mime_type.encode("utf-8") + b"\0" + data).hexdigest()
+        text = _cache_get(key)
+        stage.set(cache_hit=text is not None)
+        if text is not None:
+            return text
+        if mime_type == "application/pdf":
+            text = extract_pdf_text(data)
+        elif mime_type == "text/plain":
+            text = data.decode("utf-8", errors="replace")
+        else:
+            return ""
+        _cache_put(key, text)
+        stage.set(chars=len(text))
+        return text
+
+
+def extract_text_from_file(uploaded_file):
+    """Extract text from a Streamlit UploadedFile without writing it to disk"""
+    if uploaded_file is None:
+        return ""
+    return extract_text_from_bytes(uploaded_file.getvalue(), uploaded_file.type)
@@ -0,0 +1,156 @@
+"""
+Offline batch grading of stored interview transcripts.
+
+    python grade_batch_mvp.py transcripts.jsonl -o graded.jsonl --concurrency 8
+    python grade_batch_mvp.py transcripts.jsonl -o graded.jsonl --parquet graded.parquet
+
+Each input line is a transcript: {"id": ..., "domain": "hr", "profile": {...}, "qa_list": [{"q": ..., "a": ...}]}
+("id" is optional, the line number is used otherwise). Results are appended to the output JSONL
+as they finish, which doubles as the checkpoint: re-running the same command skips transcripts
+that were already graded and retries the ones that failed.
+"""
+import sys
+import json
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+import config_mvp as config
+from agent_mvp import UserSession
+
+
+def read_transcripts(path: str):
+    """Yield (transcript_id, record or None, error) for every non-empty input line"""
+    with open(path) as f:
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield str(line_num), None, f"invalid JSON: {e}"
+                continue
+            if not isinstance(record, dict):
+                yield str(line_num), None, "transcript must be a JSON object"
+                continue
+            yield str(record.get("id", line_num)), record, None
+
+
+def read_checkpoint(path: str) -> dict:
+    """transcript_id -> result for every transcript already in the output file"""
+    done = {}
+    try:
+        with open(path) as f:
+            for line in f:
+                try:
+                    result = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # half-written last line of an interrupted run
+                done[result["id"]] = result
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def grade_transcript(transcript_id: str, record: dict, agent_provider) -> dict:
+    """Summarize one transcript the same way the summary page does and extract its score"""
+    domain = record.get("domain")
+    if domain not in config.DOMAIN_TEMPLATES:
+        raise ValueError(f"Unknown interview domain {domain!r}")
+    qa_list = record.get("qa_list") or []
+    if not qa_list:
+        raise ValueError("Transcript has no answers")
+    session = UserSession(transcript_id)
+    session.update_profile(record.get("profile") or {})
+    for qa in qa_list:
+        session.record_response(qa['q'], qa['a'])
+    summary = agent_provider(domain).generate_summary(session, qa_list)
+    return {"score": summary.score, "rubric_score": session.score, "recommendation": summary.recommendation or None,
+            "summary": summary.to_dict()}
+
+
+def _run_one(transcript_id: str, record: dict, agent_provider) -> dict:
+    start = time.perf_counter()
+    result = {"id": transcript_id, "domain": record.get("domain"), "score": None, "rubric_score": None,
+              "recommendation": None, "summary": None, "error": None}
+    try:
+        result.update(grade_transcript(transcript_id, record, agent_provider))
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["elapsed_s"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def grade_batch(input_path: str, output_path: str, concurrency: int = 8, agent_provider=None, limit: int = None) -> dict:
+    """Grade every transcript not yet successfully graded in `output_path`; returns run counters"""
+    if agent_provider is None:
+        import resources_mvp as resources
+        agent_provider = resources.get_agent
+    done = read_checkpoint(output_path)
+    counters = {"graded": 0, "failed": 0, "skipped": 0}
+    started = time.monotonic()
+
+    with open(output_path, "a") as out, ThreadPoolExecutor(max_workers=concurrency) as pool:
+        def write(result):
+            out.write(json.dumps(result) + "\n")
+            out.flush()  # every finished transcript is checkpointed right away
+            counters["failed" if result["error"] else "graded"] += 1
+
+        pending = set()
+        submitted = 0
+        for transcript_id, record, error in read_transcripts(input_path):
+            if limit is not None and submitted >= limit:
+                break
+            previous = done.get(transcript_id)
+            if previous is not None and not previous.get("error"):
+                counters["skipped"] += 1
+                continue
+            submitted += 1
+            if error:
+                write({"id": transcript_id, "domain": None, "score": None, "rubric_score": None, "recommendation": None,
+                       "summary": None, "error": error, "elapsed_s": 0})
+                continue
+            # Keep at most 2x concurrency transcripts in memory, so huge inputs stream through
+            if len(pending) >= 2 * concurrency:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future.result())
+            pending.add(pool.submit(_run_one, transcript_id, record, agent_provider))
+        for future in wait(pending).done:
+            write(future.result())
+
+    counters["elapsed_s"] = round(time.monotonic() - started, 2)
+    return counters
+
+
+def write_parquet(jsonl_path: str, parquet_path: str):
+    """Latest result per transcript (retries supersede failures) as a Parquet table; the summary sections are a JSON column"""
+    import pandas as pd
+    results = list(read_checkpoint(jsonl_path).values())
+    for result in results:
+        result["summary"] = json.dumps(result["summary"]) if result.get("summary") is not None else None
+    columns = ["id", "domain", "score", "rubric_score", "recommendation", "summary", "error", "elapsed_s"]
+    pd.DataFrame(results, columns=columns).to_parquet(parquet_path, index=False)
+    return len(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grade stored interview transcripts offline")
+    parser.add_argument("input", help="JSONL transcripts (domain, profile, qa_list)")
+    parser.add_argument("-o", "--output", required=True, help="JSONL results, also used as the resume checkpoint")
+    parser.add_argument("--concurrency", type=int, default=config.LLM_MAX_CONCURRENCY,
+                        help="transcripts graded in parallel (the LLM gateway still enforces its rate limit)")
+    parser.add_argument("--limit", type=int, help="grade at most this many transcripts in this run")
+    parser.add_argument("--parquet", help="also write the results to this Parquet file (needs pandas + pyarrow)")
+    args = parser.parse_args(argv)
+
+    counters = grade_batch(args.input, args.output, args.concurrency, limit=args.limit)
+    print(json.dumps(counters))
+    if args.parquet:
+        rows = write_parquet(args.output, args.parquet)
+        print(f"Wrote {rows} rows to {args.parquet}", file=sys.stderr)
+    return 1 if counters["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
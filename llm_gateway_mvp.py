@@ -0,0 +1,344 @@
+"""
+Async LLM gateway: concurrency cap, token-bucket rate limiting, retries with jittered backoff,
+request deadlines and a circuit breaker in front of the chat model
+"""
+import time
+import queue
+import random
+import asyncio
+import logging
+import argparse
+import threading
+from collections import deque
+
+import config_mvp as config
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+RETRYABLE_MARKERS = ("429", "resource_exhausted", "resource has been exhausted", "rate limit",
+                     "503", "unavailable", "500 internal", "502", "504", "deadline exceeded")
+
+
+class LLMGatewayError(RuntimeError):
+    """The LLM call failed for good (retries exhausted, deadline passed or circuit open)"""
+
+
+class CircuitOpenError(LLMGatewayError):
+    """Calls are short-circuited because the backend kept failing"""
+
+
+def is_retryable(exc: Exception) -> bool:
+    """429 / 5xx style failures are worth retrying; bad requests are not"""
+    for attr in ("status_code", "code", "status"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int) and value in RETRYABLE_STATUS:
+            return True
+    message = str(exc).lower()
+    return any(marker in message for marker in RETRYABLE_MARKERS)
+
+
+def _text(message) -> str:
+    return message.content if hasattr(message, "content") else message
+
+
+def _add_usage(usage: dict, message):
+    """Add the provider's reported token usage (LangChain usage_metadata) of a reply or chunk to `usage`"""
+    reported = getattr(message, "usage_metadata", None)
+    if usage is None or not reported:
+        return
+    for key in ("input_tokens", "output_tokens"):
+        usage[key] = usage.get(key, 0) + int(reported.get(key) or 0)
+
+
+class TokenBucket:
+    """`rate` requests per second on average, with bursts of up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= 1:
+                self.tokens -= 1
+                return
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures, lets one trial call through after `reset_seconds`
+    (half-open: every other call is rejected until the trial records a success or a failure)
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at = None
+        self.trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return "half-open"
+        return "open"
+
+    def check(self) -> bool:
+        """Raise CircuitOpenError unless this call may go through; True if it is the half-open trial call"""
+        state = self.state
+        if state == "open" or (state == "half-open" and self.trial_in_flight):
+            raise CircuitOpenError("LLM backend is failing, calls are paused for a moment")
+        if state == "half-open":
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def end_trial(self):
+        """The trial call is over (even if it ended without a verdict, e.g. a non-retryable error)"""
+        self.trial_in_flight = False
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold or self.state == "half-open":
+            self.opened_at = time.monotonic()
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def get_event_loop():
+    """One background event loop per process that runs every gateway call"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="llm-gateway-loop", daemon=True).start()
+        return _loop
+
+
+class LLMGateway:
+    """
+    Wraps a chat model exposing ainvoke/astream (any LangChain chat model, or the StubLLM provider).
+    Async callers use ainvoke/astream; the synchronous invoke/stream run them on the gateway's
+    event loop thread, so Streamlit and worker threads can call it directly.
+    """
+
+    def __init__(self, backend, max_concurrency: int = None, rate_per_second: float = None, burst: int = None,
+                 max_retries: int = None, backoff_base: float = None, backoff_max: float = None,
+                 deadline_seconds: float = None, breaker: CircuitBreaker = None):
+        self.backend = backend
+        self.max_concurrency = max_concurrency or config.LLM_MAX_CONCURRENCY
+        self.semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.bucket = TokenBucket(rate_per_second or config.LLM_RATE_PER_SECOND, burst or config.LLM_BURST)
+        self.max_retries = config.LLM_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff_base = backoff_base or config.LLM_BACKOFF_BASE_SECONDS
+        self.backoff_max = backoff_max or config.LLM_BACKOFF_MAX_SECONDS
+        self.deadline_seconds = deadline_seconds or config.LLM_DEADLINE_SECONDS
+        self.breaker = breaker or CircuitBreaker(config.LLM_BREAKER_FAILURES, config.LLM_BREAKER_RESET_SECONDS)
+        self.queued = 0
+        self.in_flight = 0
+        self.counters = {"requests": 0, "succeeded": 0, "failed": 0, "retries": 0, "short_circuited": 0}
+        self.latencies = deque(maxlen=1000)
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _release_slot(self):
+        self.in_flight -= 1
+        self.semaphore.release()
+
+    async def _attempts(self, call, deadline: float, keep_slot: bool = False):
+        """
+        Run `call()` under the concurrency/rate limits, retrying retryable failures until the deadline.
+        With keep_slot the concurrency slot stays taken after a success; the caller must _release_slot().
+        """
+        self.counters["requests"] += 1
+        try:
+            trial = self.breaker.check()
+        except CircuitOpenError:
+            self.counters["short_circuited"] += 1
+            raise
+        try:
+            attempt = 0
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.counters["failed"] += 1
+                    raise LLMGatewayError(f"LLM request missed its {self.deadline_seconds:g}s deadline")
+                self.queued += 1
+                try:
+                    await asyncio.wait_for(self.bucket.acquire(), remaining)
+                    await asyncio.wait_for(self.semaphore.acquire(), deadline - time.monotonic())
+                except asyncio.TimeoutError:
+                    self.counters["failed"] += 1
+                    raise LLMGatewayError("Timed out waiting for an LLM slot")
+                finally:
+                    self.queued -= 1
+                self.in_flight += 1
+                kept = False
+                try:
+                    result = await asyncio.wait_for(call(), max(0.0, deadline - time.monotonic()))
+                    self.breaker.record_success()
+                    self.counters["succeeded"] += 1
+                    kept = keep_slot
+                    return result
+                except asyncio.TimeoutError:
+                    self.breaker.record_failure()
+                    self.counters["failed"] += 1
+                    raise LLMGatewayError(f"LLM request missed its {self.deadline_seconds:g}s deadline")
+                except Exception as e:
+                    if not is_retryable(e):
+                        self.counters["failed"] += 1
+                        raise LLMGatewayError(f"LLM request failed: {e}") from e
+                    self.breaker.record_failure()
+                    if attempt >= self.max_retries or self.breaker.state == "open":
+                        self.counters["failed"] += 1
+                        raise LLMGatewayError(f"LLM request failed after {attempt + 1} attempts: {e}") from e
+                    delay = self._backoff(attempt)
+                    attempt += 1
+                    self.counters["retries"] += 1
+                    logging.warning(f"Retryable LLM error ({e}), retry {attempt} in {delay:.2f}s")
+                finally:
+                    if not kept:
+                        self._release_slot()
+                await asyncio.sleep(min(delay, max(0.0, deadline - time.monotonic())))
+        finally:
+            if trial:
+                self.breaker.end_trial()
+
+    async def ainvoke(self, prompt: str, usage: dict = None) -> str:
+        """The reply's text; `usage`, if given, receives the provider's input_tokens/output_tokens (when reported)"""
+        start = time.monotonic()
+        result = await self._attempts(lambda: self.backend.ainvoke(prompt), start + self.deadline_seconds)
+        self.latencies.append(time.monotonic() - start)
+        _add_usage(usage, result)
+        return _text(result)
+
+    async def astream(self, prompt: str, usage: dict = None):
+        """
+        Yields text chunks. Retries only happen before the first chunk; after that, failures propagate.
+        `usage` receives the token usage summed over the chunks, as for ainvoke.
+        """
+        start = time.monotonic()
+        deadline = start + self.deadline_seconds
+        stream = {}
+
+        async def first_chunk():
+            # A fresh backend stream per attempt; a failed async generator can't be resumed
+            stream["chunks"] = self.backend.astream(prompt).__aiter__()
+            try:
+                return await stream["chunks"].__anext__()
+            except StopAsyncIteration:
+                return None
+
+        # The concurrency slot is held for the whole stream, not just until the first chunk
+        chunk = await self._attempts(first_chunk, deadline, keep_slot=True)
+        chunks = stream["chunks"]
+        try:
+            if chunk is None:
+                return
+            _add_usage(usage, chunk)
+            yield _text(chunk)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - time.monotonic()))
+                except StopAsyncIteration:
+                    break
+                except asyncio.TimeoutError:
+                    raise LLMGatewayError(f"LLM stream missed its {self.deadline_seconds:g}s deadline")
+                _add_usage(usage, chunk)
+                yield _text(chunk)
+            self.latencies.append(time.monotonic() - start)
+        finally:
+            self._release_slot()
+            if hasattr(chunks, "aclose"):
+                await chunks.aclose()
+
+    def invoke(self, prompt: str, usage: dict = None) -> str:
+        """Blocking call from any thread"""
+        return asyncio.run_coroutine_threadsafe(self.ainvoke(prompt, usage), get_event_loop()).result()
+
+    def stream(self, prompt: str, usage: dict = None):
+        """
+        Blocking generator from any thread; chunks are handed over from the event loop through a queue.
+        Closing the generator early (e.g. a Streamlit rerun) cancels the backend stream.
+        """
+        chunks = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for chunk in self.astream(prompt, usage):
+                    chunks.put(chunk)
+            except asyncio.CancelledError:
+                raise
+            except BaseException as e:
+                chunks.put(e)
+            finally:
+                chunks.put(done)
+
+        future = asyncio.run_coroutine_threadsafe(pump(), get_event_loop())
+        try:
+            while True:
+                item = chunks.get()
+                if item is done:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    def metrics(self) -> dict:
+        latencies = sorted(self.latencies)
+
+        def pct(p):
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))], 3) if latencies else None
+
+        return {
+            "queue_depth": self.queued,
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "circuit": self.breaker.state,
+            **self.counters,
+            "latency_p50": pct(0.50),
+            "latency_p95": pct(0.95),
+        }
+
+
+async def _load_test(gateway: LLMGateway, requests: int):
+    async def one(i):
+        try:
+            await gateway.ainvoke(f"prompt {i}")
+        except LLMGatewayError:
+            pass
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+
+
+if __name__ == "__main__":
+    # Offline load test: python llm_gateway_mvp.py --requests 200 --error-rate 0.2
+    from llm_providers_mvp import StubLLM
+    parser = argparse.ArgumentParser(description="Load-test the LLM gateway against the stub provider")
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    gateway = LLMGateway(StubLLM(first_token_ms=args.latency_ms, error_rate=args.error_rate))
+    started = time.monotonic()
+    asyncio.run(_load_test(gateway, args.requests))
+    print(f"{args.requests} requests in {time.monotonic() - started:.2f}s")
+    print(gateway.metrics())
@@ -0,0 +1,136 @@
+"""
+LLM provider layer: Gemini, or a deterministic local stub for offline benchmarking and load tests
+"""
+import re
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+
+import config_mvp as config
+
+TEMPLATE_QUESTION_PATTERN = re.compile(r'Suggested question from the template \(optional\): "(.*)"')
+# How InterviewerAgent's summary and assessment prompts start (a resume or persona mentioning "summary" doesn't count)
+SUMMARY_PROMPT_PATTERN = re.compile(r"Based on .{0,80}? interview, provide a concise professional summary:")
+ASSESSMENT_PROMPT_PREFIX = "You are assessing one answer"
+
+STUB_SUMMARY = """{
+  "overall_assessment": "The candidate gave structured answers with concrete examples and a clear view of trade-offs.",
+  "key_strengths": ["Clear communication", "Relevant hands-on experience", "Good awareness of trade-offs"],
+  "areas_for_development": ["Quantify impact more often", "Go deeper on failure handling"],
+  "pitfalls": ["Answers occasionally stayed high level"],
+  "resources": ["Practice with mock interviews (e.g. https://www.pramp.com)"],
+  "recommendation": "Maybe",
+  "recommendation_reason": "Solid fundamentals, needs more depth.",
+  "score": 72
+}"""
+
+STUB_ASSESSMENT = """Strengths: concrete example, clear structure.
+Gaps: little on measurable impact or trade-offs.
+Answer score: 7/10"""
+
+
+class StubLLM:
+    """
+    Offline chat model with the same invoke/stream/ainvoke/astream surface as the LangChain models.
+    Replies are canned and deterministic per prompt; latency is a seeded time-to-first-token draw
+    followed by `tokens_per_second` streaming, so runs are repeatable and cost no API quota.
+    The draw depends on the prompt and how often that prompt was sent before (so a retry can succeed
+    where the first attempt failed), not on the other calls in flight. Only the last ATTEMPT_HISTORY
+    prompts are remembered, so long load tests run in constant memory.
+    """
+
+    ATTEMPT_HISTORY = 4096
+
+    def __init__(self, first_token_ms: float = None, jitter_ms: float = None, tokens_per_second: float = None,
+                 error_rate: float = None, seed: int = None):
+        self.first_token_ms = config.STUB_FIRST_TOKEN_MS if first_token_ms is None else first_token_ms
+        self.jitter_ms = config.STUB_JITTER_MS if jitter_ms is None else jitter_ms
+        self.tokens_per_second = tokens_per_second or config.STUB_TOKENS_PER_SECOND
+        self.error_rate = config.STUB_ERROR_RATE if error_rate is None else error_rate
+        self.seed = config.STUB_SEED if seed is None else seed
+        self.calls = 0
+        self._attempts = OrderedDict()  # prompt digest -> times sent, least recently sent first
+        self._lock = threading.Lock()
+
+    def _rng(self, prompt: str) -> random.Random:
+        prompt_digest = hashlib.sha256(f"{self.seed}\0{prompt}".encode("utf-8")).digest()
+        with self._lock:
+            self.calls += 1
+            attempt = self._attempts.pop(prompt_digest, 0)
+            self._attempts[prompt_digest] = attempt + 1
+            if len(self._attempts) > self.ATTEMPT_HISTORY:
+                self._attempts.popitem(last=False)
+        digest = hashlib.sha256(prompt_digest + attempt.to_bytes(8, "big")).digest()
+        return random.Random(int.from_bytes(digest[:8], "big"))
+
+    def reply(self, prompt: str) -> str:
+        """Canned answer for the prompt: a JSON summary, an answer assessment, or else the template question"""
+        if prompt.startswith(ASSESSMENT_PROMPT_PREFIX):
+            return STUB_ASSESSMENT
+        if SUMMARY_PROMPT_PATTERN.match(prompt):
+            return STUB_SUMMARY
+        match = TEMPLATE_QUESTION_PATTERN.search(prompt)
+        if match and match.group(1):
+            return f"Great, thanks. {match.group(1)}"
+        return "Could you walk me through a recent project you are proud of?"
+
+    def _plan(self, prompt: str):
+        """(first token delay, per-token delay, tokens) for one call"""
+        rng = self._rng(prompt)
+        if rng.random() < self.error_rate:
+            raise RuntimeError("429 Resource has been exhausted (stub)")
+        first_token = max(0.0, rng.gauss(self.first_token_ms, self.jitter_ms)) / 1000
+        tokens = [word + " " for word in self.reply(prompt).split(" ")]
+        return first_token, 1 / self.tokens_per_second, tokens
+
+    def invoke(self, prompt: str) -> str:
+        first_token, per_token, tokens = self._plan(prompt)
+        time.sleep(first_token + per_token * len(tokens))
+        return "".join(tokens).strip()
+
+    def stream(self, prompt: str):
+        first_token, per_token, tokens = self._plan(prompt)
+        time.sleep(first_token)
+        for token in tokens:
+            yield token
+            time.sleep(per_token)
+
+    async def ainvoke(self, prompt: str) -> str:
+        first_token, per_token, tokens = self._plan(prompt)
+        await asyncio.sleep(first_token + per_token * len(tokens))
+        return "".join(tokens).strip()
+
+    async def astream(self, prompt: str):
+        first_token, per_token, tokens = self._plan(prompt)
+        await asyncio.sleep(first_token)
+        for token in tokens:
+            yield token
+            await asyncio.sleep(per_token)
+
+
+def create_gemini_llm(google_api_key: str):
+    """Gemini chat client; build it once and share it, the connection setup isn't free"""
+    from langchain_google_genai import ChatGoogleGenerativeAI
+    return ChatGoogleGenerativeAI(
+        model=config.GEMINI_MODEL,
+        google_api_key=google_api_key,
+        temperature=0.7,
+        max_retries=0  # retries, backoff and deadlines are handled by LLMGateway
+    )
+
+
+PROVIDERS = {
+    "gemini": lambda google_api_key: create_gemini_llm(google_api_key),
+    "stub": lambda google_api_key: StubLLM(),
+}
+
+
+def create_llm(google_api_key: str = "", provider: str = None):
+    """Chat model for the configured LLM_PROVIDER ("gemini" or "stub")"""
+    provider = provider or config.LLM_PROVIDER
+    if provider not in PROVIDERS:
+        raise ValueError(f"Unknown LLM_PROVIDER {provider!r}, expected one of {sorted(PROVIDERS)}")
+    return PROVIDERS[provider](google_api_key)
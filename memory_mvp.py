@@ -0,0 +1,86 @@
+"""
+Bounded conversation memory: recent turns verbatim, older turns folded into a rolling summary
+"""
+import re
+
+import config_mvp as config
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)"""
+    return (len(text or "") + 3) // 4
+
+
+def _first_sentence(text: str, max_words: int) -> str:
+    sentence = re.split(r"(?<=[.!?])\s+", (text or "").strip(), maxsplit=1)[0]
+    words = sentence.split()
+    if len(words) > max_words:
+        return " ".join(words[:max_words]) + " ..."
+    return sentence
+
+
+def extractive_fold(summary: str, question: str, answer: str, turn_num: int) -> str:
+    """Default summarizer: append one compact line per folded turn, no LLM call"""
+    line = f"- Q{turn_num}: {_first_sentence(question, 15)} -> {_first_sentence(answer, 30)}"
+    return f"{summary}\n{line}" if summary else line
+
+
+class ConversationMemory:
+    """
+    Keeps the last `recent_turns` Q&A pairs verbatim and folds older ones into a rolling summary,
+    so the prompt stays within `token_budget` however long the interview gets.
+    `summarizer(summary, question, answer, turn_num) -> new summary` can replace the extractive default
+    (e.g. with an LLM call); it only ever sees the previous summary plus one turn.
+    """
+
+    def __init__(self, recent_turns: int = None, token_budget: int = None, summarizer=None):
+        self.recent_turns = recent_turns if recent_turns is not None else config.MEMORY_RECENT_TURNS
+        self.token_budget = token_budget if token_budget is not None else config.MEMORY_TOKEN_BUDGET
+        self.summarizer = summarizer or extractive_fold
+        self.turns = []  # [{'q': ..., 'a': ...}] kept verbatim
+        self.summary = ""
+        self.folded_turns = 0
+
+    def add_turn(self, question: str, answer: str):
+        self.turns.append({'q': question, 'a': answer})
+        while len(self.turns) > self.recent_turns:
+            oldest = self.turns.pop(0)
+            self.folded_turns += 1
+            self.summary = self.summarizer(self.summary, oldest['q'], oldest['a'], self.folded_turns)
+        self._enforce_budget()
+
+    def _enforce_budget(self):
+        # Drop the oldest summary lines first, then shorten the oldest verbatim answers
+        while estimate_tokens(self.render()) > self.token_budget and "\n" in self.summary:
+            self.summary = self.summary.split("\n", 1)[1]
+        for turn in self.turns:
+            overflow = estimate_tokens(self.render()) - self.token_budget
+            if overflow <= 0:
+                break
+            keep_chars = max(200, len(turn['a']) - overflow * 4)
+            if keep_chars < len(turn['a']):
+                turn['a'] = turn['a'][:keep_chars] + " ..."
+
+    def render(self) -> str:
+        """Conversation text for the prompt ("" when nothing has been said yet)"""
+        parts = []
+        if self.summary:
+            parts.append(f"Earlier in the interview (summary):\n{self.summary}")
+        if self.turns:
+            recent = "\n".join(f"Q: {turn['q']}\nA: {turn['a']}" for turn in self.turns)
+            parts.append(f"Most recent exchanges:\n{recent}" if self.summary else recent)
+        return "\n\n".join(parts)
+
+    def token_count(self) -> int:
+        return estimate_tokens(self.render())
+
+    def to_dict(self) -> dict:
+        return {'turns': self.turns, 'summary': self.summary, 'folded_turns': self.folded_turns}
+
+    @classmethod
+    def from_dict(cls, data: dict, summarizer=None):
+        memory = cls(summarizer=summarizer)
+        memory.turns = [dict(turn) for turn in data.get('turns', [])]
+        memory.summary = data.get('summary', "")
+        memory.folded_turns = data.get('folded_turns', 0)
+        return memory
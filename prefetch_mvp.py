@@ -0,0 +1,159 @@
+"""
+Speculative prefetch of the next interview question while the candidate is typing
+"""
+import re
+import hashlib
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import config_mvp as config
+
+PENDING_ANSWER = "(the candidate is still answering)"
+CONTENT_WORD = re.compile(r"[a-z][a-z'-]{3,}")
+STOPWORDS = frozenset((
+    "tell", "about", "what", "your", "have", "with", "that", "this", "when", "where", "which", "were", "there",
+    "their", "would", "could", "should", "time", "describe", "give", "example", "some", "into", "from", "they",
+    "them", "been", "does", "make", "made", "how's", "what's", "more", "most", "other", "than", "then", "also",
+))
+
+# Process-wide counters across all sessions
+_totals_lock = threading.Lock()
+_totals = {"hits": 0, "misses": 0, "started": 0, "rejected": 0}
+
+
+def _count(name: str):
+    with _totals_lock:
+        _totals[name] += 1
+
+
+def global_stats() -> dict:
+    """Hit/miss counts summed over every session in this process"""
+    with _totals_lock:
+        stats = dict(_totals)
+    looked_up = stats["hits"] + stats["misses"]
+    stats["hit_rate"] = round(stats["hits"] / looked_up, 3) if looked_up else None
+    return stats
+
+
+def content_words(text: str) -> set:
+    """Lower-cased words of 4+ letters minus filler, with a plural 's' stripped"""
+    words = (word[:-2] if word.endswith("'s") else word for word in CONTENT_WORD.findall(text.lower()))
+    return {word[:-1] if word.endswith("s") and not word.endswith("ss") else word
+            for word in words if word not in STOPWORDS}
+
+
+def topic_overlap(answer: str, question: str) -> float:
+    """Share of the question's content words the answer mentions (1.0 for a question without any)"""
+    topic = content_words(question)
+    return len(topic & content_words(answer)) / len(topic) if topic else 1.0
+
+
+def speculation_fits(answer: str, answered_question: str) -> bool:
+    """
+    Whether a question generated before `answer` was known can still follow it: a short answer leaves
+    little to follow up on, and an answer that stays on the asked topic matches the speculative prompt.
+    A long answer that wanders off (new projects, new problems) gets a regenerated, adaptive question.
+    """
+    return (len(answer.split()) <= config.PREFETCH_MAX_ANSWER_WORDS
+            or topic_overlap(answer, answered_question) >= config.PREFETCH_MIN_TOPIC_OVERLAP)
+
+
+def speculation_key(domain: str, question_num: int, conversation: str, template_question: str = "") -> str:
+    """Identifies a speculative question by what it was generated from"""
+    payload = f"{domain}\n{question_num}\n{conversation}\n{template_question or ''}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _speculate(agent, session, question_num, conversation, resume_text, jobdesc_text, context_loader, template_question):
+    context_passages = context_loader() if context_loader is not None else None
+    return agent.generate_question(session, question_num, conversation, resume_text, jobdesc_text, context_passages,
+                                   template_question, speculative=True)
+
+
+class QuestionPrefetcher:
+    """
+    Generates question N+1 in a background thread while question N is on screen.
+    The real answer isn't known yet, so the speculative prompt carries the current template
+    question with a placeholder answer. When the answer lands, the speculation is used if it
+    finished in time and still fits the answer (see speculation_fits); otherwise it is dropped and
+    the question is regenerated (a miss, counted as rejected when it didn't fit).
+    With a question bank the next template question is picked before the answer is known, so a
+    speculation also misses when the real pick differs.
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.pending = {}  # speculation_key -> Future
+        self.hits = 0
+        self.misses = 0
+        self.rejected = 0
+
+    def start(self, agent, session, question_num: int, current_template_question: str, conversation: str,
+              resume_text: str = "", jobdesc_text: str = "", context_loader=None, next_template_question: str = None):
+        """
+        Kick off speculative generation of question `question_num + 1` (no-op if already running).
+        `context_loader()`, if given, fetches the retrieval passages on the background thread too.
+        """
+        key = speculation_key(agent.domain, question_num + 1, conversation, next_template_question)
+        if key in self.pending:
+            return key
+        speculative_conversation = f"{conversation}\nQ: {current_template_question}\nA: {PENDING_ANSWER}"
+        self.pending[key] = self.executor.submit(
+            _speculate,
+            agent,
+            session,
+            question_num + 1,
+            speculative_conversation,
+            resume_text,
+            jobdesc_text,
+            context_loader,
+            next_template_question
+        )
+        _count("started")
+        return key
+
+    def take(self, domain: str, question_num: int, conversation: str, wait_seconds: float = 0.0,
+             template_question: str = None, answer: str = "", answered_question: str = ""):
+        """
+        Reconcile with the real answer: return the speculative question for `question_num` (generated
+        from `conversation`, the transcript before the latest answer, and `template_question`),
+        or None if it must be regenerated because it is missing, late, or doesn't fit `answer`
+        to `answered_question`.
+        """
+        future = self.pending.pop(speculation_key(domain, question_num, conversation, template_question), None)
+        self.discard()
+        question = None
+        if future is not None and not speculation_fits(answer, answered_question):
+            future.cancel()
+            self.rejected += 1
+            _count("rejected")
+        elif future is not None:
+            try:
+                question = future.result(timeout=wait_seconds)
+            except FutureTimeoutError:
+                future.cancel()
+            except Exception as e:
+                logging.warning(f"Speculative question generation failed: {e}")
+        if question:
+            self.hits += 1
+            _count("hits")
+        else:
+            self.misses += 1
+            _count("misses")
+        return question or None
+
+    def discard(self):
+        """Drop all outstanding speculations (e.g. on restart)"""
+        for future in self.pending.values():
+            future.cancel()
+        self.pending.clear()
+
+    def stats(self) -> dict:
+        looked_up = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "rejected": self.rejected,
+            "hit_rate": round(self.hits / looked_up, 3) if looked_up else None,
+        }
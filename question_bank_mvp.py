@@ -0,0 +1,255 @@
+"""
+Question banks loaded from files, with precomputed embeddings and nearest-neighbour question selection.
+
+    question_banks/engineering.jsonl   one question per line:
+        {"id": "eng-0001", "question": "...", "seniority": "senior", "topics": ["system design"]}
+
+    python question_bank_mvp.py build            # (re)build every <domain>.npy index next to its .jsonl
+    python question_bank_mvp.py select engineering "resume / answers text"
+
+The index is a float32 matrix of L2-normalized question embeddings (<domain>.npy) plus a small
+<domain>.index.json (model + encoder backend, source hash, ids, tags). It is memory-mapped at load time, so thousands
+of questions cost neither start-up time nor private memory, and picking the next question is one
+mat-vec product over the bank: no LLM call. Domains without a bank file keep using DOMAIN_TEMPLATES.
+question_banks/engineering.jsonl is a small example bank (the index is built on first use).
+"""
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import argparse
+from dataclasses import dataclass
+
+import config_mvp as config
+from encoder_backends_mvp import encoder_id
+
+SENIORITY_LEVELS = ("junior", "mid", "senior")
+
+
+@dataclass
+class BankQuestion:
+    id: str
+    question: str
+    seniority: str = ""
+    topics: tuple = ()
+
+    def to_dict(self) -> dict:
+        return {"id": self.id, "q": self.question}
+
+
+def bank_paths(domain: str, directory: str = None):
+    """(source .jsonl, embeddings .npy, index .json) for a domain's bank"""
+    base = os.path.join(config.QUESTION_BANK_DIR if directory is None else directory, domain)
+    return f"{base}.jsonl", f"{base}.npy", f"{base}.index.json"
+
+
+def read_bank_file(path: str) -> list:
+    """BankQuestions from a .jsonl bank file (blank lines skipped; ids default to the line number)"""
+    questions = []
+    with open(path) as f:
+        for line_num, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            seniority = (record.get("seniority") or "").lower()
+            if seniority and seniority not in SENIORITY_LEVELS:
+                raise ValueError(f"{path}:{line_num}: unknown seniority {seniority!r}, expected one of {SENIORITY_LEVELS}")
+            questions.append(BankQuestion(
+                id=str(record.get("id", line_num)),
+                question=record["question"],
+                seniority=seniority,
+                topics=tuple(record.get("topics", ())),
+            ))
+    return questions
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def build_index(domain: str, encoder, directory: str = None, batch_size: int = 256) -> int:
+    """Embed a domain's bank file and write its .npy matrix + .index.json; returns the number of questions"""
+    import numpy as np
+    source_path, array_path, index_path = bank_paths(domain, directory)
+    questions = read_bank_file(source_path)
+    vectors = np.asarray(encoder.encode([q.question for q in questions], batch_size=batch_size), dtype=np.float32)
+    vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+    # Replace, never rewrite in place: other workers may have the old matrix memory-mapped
+    tmp_array_path = f"{array_path}.tmp"
+    with open(tmp_array_path, "wb") as f:
+        np.save(f, vectors)
+    os.replace(tmp_array_path, array_path)
+    tmp_path = f"{index_path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({
+            "model": encoder_id(),
+            "source_sha256": _file_digest(source_path),
+            "count": len(questions),
+            "dim": int(vectors.shape[1]),
+            "questions": [[q.id, q.question, q.seniority, list(q.topics)] for q in questions],
+        }, f)
+    os.replace(tmp_path, index_path)
+    return len(questions)
+
+
+class QuestionBank:
+    """
+    One domain's bank. encoder_provider / embedding_cache_provider are zero-arg callables (the shared
+    resources), only used to embed the candidate context; the bank vectors come from the index.
+    """
+
+    def __init__(self, domain: str, questions: list, vectors, encoder_provider=None, embedding_cache_provider=None):
+        import numpy as np
+        self.domain = domain
+        self.questions = questions
+        self.vectors = vectors  # (n, dim) float32, L2-normalized, usually a read-only memmap
+        self.encoder_provider = encoder_provider
+        self.embedding_cache_provider = embedding_cache_provider
+        self.row = {q.id: i for i, q in enumerate(questions)}
+        levels = np.array([q.seniority for q in questions])
+        # Rows to skip per candidate seniority: tagged with another level (untagged questions fit every level)
+        self._other_levels = {level: (levels != level) & (levels != "") for level in SENIORITY_LEVELS}
+        self._topics = [frozenset(topic.lower() for topic in q.topics) for q in questions]
+
+    @classmethod
+    def load(cls, domain: str, directory: str = None, encoder_provider=None, embedding_cache_provider=None,
+             index_encoder_provider=None):
+        """
+        The domain's bank, (re)building a missing or stale index first; None if the domain has no bank file.
+        The index is built with index_encoder_provider() (default: encoder_provider()) on this thread.
+        """
+        import numpy as np
+        source_path, array_path, index_path = bank_paths(domain, directory)
+        if not os.path.exists(source_path):
+            return None
+        index = None
+        if os.path.exists(index_path) and os.path.exists(array_path):
+            with open(index_path) as f:
+                index = json.load(f)
+            if index.get("model") != encoder_id() or index.get("source_sha256") != _file_digest(source_path):
+                index = None
+        if index is None:
+            index_encoder_provider = index_encoder_provider or encoder_provider
+            if index_encoder_provider is None:
+                raise RuntimeError(f"Question bank index for {domain!r} is missing or stale and there is no encoder to build it")
+            logging.info(f"Building question bank index for {domain!r}")
+            build_index(domain, index_encoder_provider(), directory)
+            with open(index_path) as f:
+                index = json.load(f)
+        vectors = np.load(array_path, mmap_mode="r")
+        if vectors.shape[0] != index["count"]:
+            # Another worker replaced the matrix between our two reads: its new index is in place by now
+            with open(index_path) as f:
+                index = json.load(f)
+        questions = [BankQuestion(question_id, question, seniority, tuple(topics))
+                     for question_id, question, seniority, topics in index["questions"]]
+        return cls(domain, questions, vectors, encoder_provider, embedding_cache_provider)
+
+    def __len__(self) -> int:
+        return len(self.questions)
+
+    def embed(self, texts: list):
+        """Mean of the L2-normalized embeddings of `texts`, normalized (through the embedding cache if there is one)"""
+        import numpy as np
+        encoder = self.encoder_provider()
+        if self.embedding_cache_provider is not None:
+            vectors = self.embedding_cache_provider().encode(encoder, texts)
+        else:
+            vectors = np.asarray(encoder.encode(texts), dtype=np.float32)
+        vectors = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        query = vectors.mean(axis=0)
+        return query / max(float(np.linalg.norm(query)), 1e-12)
+
+    def nearest(self, query, asked_ids=(), seniority: str = "", candidates: int = None,
+                repeat_penalty: float = None, topic_penalty: float = None):
+        """
+        (question, similarity) of the best unasked question for `query`, or (None, 0.0) if none is left.
+        The top `candidates` by similarity are re-ranked with a penalty on their similarity to the
+        questions already asked, so a session doesn't get three rewordings of the same question,
+        and a penalty on the share of their topics already covered, so it moves on to new topics.
+        Questions tagged with another seniority are skipped.
+        """
+        import numpy as np
+        candidates = candidates or config.QUESTION_BANK_CANDIDATES
+        repeat_penalty = config.QUESTION_BANK_REPEAT_PENALTY if repeat_penalty is None else repeat_penalty
+        topic_penalty = config.QUESTION_BANK_TOPIC_PENALTY if topic_penalty is None else topic_penalty
+        similarities = self.vectors @ query
+        asked_rows = [self.row[question_id] for question_id in asked_ids if question_id in self.row]
+        similarities[asked_rows] = -np.inf
+        if seniority in self._other_levels:
+            similarities[self._other_levels[seniority]] = -np.inf
+        top = min(candidates, len(similarities))
+        if top == 0:
+            return None, 0.0
+        shortlist = np.argpartition(-similarities, top - 1)[:top]
+        shortlist = shortlist[np.isfinite(similarities[shortlist])]
+        if not len(shortlist):
+            return None, 0.0
+        ranked = similarities[shortlist]
+        if asked_rows and repeat_penalty:
+            overlap = (self.vectors[shortlist] @ self.vectors[asked_rows].T).max(axis=1)
+            ranked = ranked - repeat_penalty * overlap
+        covered = frozenset().union(*(self._topics[row] for row in asked_rows))
+        if covered and topic_penalty:
+            ranked = ranked - topic_penalty * np.array(
+                [len(self._topics[row] & covered) / len(self._topics[row]) if self._topics[row] else 0.0 for row in shortlist]
+            )
+        best = shortlist[int(np.argmax(ranked))]
+        return self.questions[best], float(similarities[best])
+
+    def select(self, context_texts: list, asked_ids=(), seniority: str = ""):
+        """(question, similarity) closest to the candidate context (resume/JD/profile, recent answers)"""
+        texts = [text for text in context_texts if text and text.strip()]
+        if not texts:
+            # Nothing known about the candidate yet: take the first unasked question in file order
+            asked = set(asked_ids)
+            for question in self.questions:
+                if question.id not in asked and (not seniority or question.seniority in ("", seniority)):
+                    return question, 0.0
+            return None, 0.0
+        return self.nearest(self.embed(texts), asked_ids, seniority)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build or query the question bank indexes")
+    parser.add_argument("--dir", default=None, help=f"bank directory (default {config.QUESTION_BANK_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="embed every <domain>.jsonl bank into its .npy index")
+    build.add_argument("domains", nargs="*", help="domains to build (default: every bank file)")
+    select = commands.add_parser("select", help="pick a question for a context text")
+    select.add_argument("domain")
+    select.add_argument("context")
+    select.add_argument("--seniority", default="", choices=("",) + SENIORITY_LEVELS)
+    args = parser.parse_args(argv)
+
+    import resources_mvp as resources
+    directory = config.QUESTION_BANK_DIR if args.dir is None else args.dir
+    if args.command == "build":
+        domains = args.domains or sorted(name[:-len(".jsonl")] for name in os.listdir(directory) if name.endswith(".jsonl"))
+        for domain in domains:
+            start = time.perf_counter()
+            count = build_index(domain, resources.get_encoder(), directory)
+            print(f"{domain}: {count} questions indexed in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        return 0
+
+    bank = QuestionBank.load(args.domain, directory, resources.get_encoder)
+    if bank is None:
+        print(f"No question bank for {args.domain!r} in {directory}", file=sys.stderr)
+        return 1
+    query = bank.embed([args.context])
+    start = time.perf_counter()
+    question, similarity = bank.nearest(query, seniority=args.seniority)
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(json.dumps({"id": question.id if question else None, "question": question.question if question else None,
+                      "similarity": round(similarity, 4), "select_ms": round(elapsed_ms, 3), "bank_size": len(bank)}))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,305 @@
+"""
+Process-wide shared resources (encoder, vector store, LLM agents) for all Streamlit sessions
+"""
+import os
+import sys
+import json
+import time
+import logging
+import threading
+
+import config_mvp as config
+
+
+def current_rss_mb() -> float:
+    """Resident memory of this process in MB (0.0 when it can't be determined)"""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+        # ru_maxrss is the peak, in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except (ImportError, OSError):
+        return 0.0
+
+
+class ResourceRegistry:
+    """Loads heavy resources once per process and hands the same instance to every session"""
+
+    def __init__(self):
+        # One lock per resource, so a cheap resource never waits behind a heavy one loading on another thread;
+        # re-entrant so a loader can depend on another registry resource. _locks_lock only creates them.
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+        self._resources = {}
+        self.stats = {}  # name -> {"load_seconds": float, "rss_mb_before": float, "rss_mb_after": float}
+
+    def _lock(self, name: str):
+        with self._locks_lock:
+            lock = self._locks.get(name)
+            if lock is None:
+                lock = self._locks[name] = threading.RLock()
+            return lock
+
+    def get(self, name: str, loader):
+        """Return the resource `name`, calling `loader()` exactly once across all threads"""
+        resource = self._resources.get(name)
+        if resource is not None:
+            return resource
+        with self._lock(name):
+            resource = self._resources.get(name)
+            if resource is None:
+                rss_before = current_rss_mb()
+                start = time.perf_counter()
+                resource = loader()
+                load_seconds = time.perf_counter() - start
+                self._resources[name] = resource
+                self.stats[name] = {
+                    "load_seconds": round(load_seconds, 3),
+                    "rss_mb_before": round(rss_before, 1),
+                    "rss_mb_after": round(current_rss_mb(), 1),
+                }
+                logging.info(f"Loaded {name} in {load_seconds:.2f}s (RSS {self.stats[name]['rss_mb_after']} MB)")
+        return resource
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._resources
+
+    def discard(self, name: str, resource) -> bool:
+        """Forget `name` if it is still `resource` (the next get() loads a fresh one); True if it was"""
+        with self._lock(name):
+            if self._resources.get(name) is not resource:
+                return False
+            del self._resources[name]
+            self.stats.pop(name, None)
+            return True
+
+    def report(self) -> dict:
+        """Load time and memory per resource, plus the current process RSS"""
+        return {"resources": dict(self.stats), "rss_mb": round(current_rss_mb(), 1)}
+
+
+registry = ResourceRegistry()
+
+
+def _load_encoder():
+    from encoder_backends_mvp import create_encoder
+    return create_encoder(config.EMBEDDING_BACKEND)
+
+
+def _load_embedding_cache():
+    from embedding_cache_mvp import EmbeddingCache
+    from encoder_backends_mvp import encoder_id
+    return EmbeddingCache(encoder_id())
+
+
+def _load_chroma_client():
+    import chromadb
+    if config.CHROMA_PATH:
+        # On-disk store shared by every session in the process; survives restarts
+        return chromadb.PersistentClient(path=config.CHROMA_PATH)
+    return chromadb.Client()
+
+
+def get_encoder():
+    """Shared sentence encoder (EMBEDDING_BACKEND)"""
+    return registry.get("encoder", _load_encoder)
+
+
+def get_embedder():
+    """What sessions encode with: the shared micro-batching service (EMBEDDING_BATCHING=1) or the encoder itself"""
+    if not config.EMBEDDING_BATCHING:
+        return get_encoder()
+    from embedding_service_mvp import EmbeddingService
+    return registry.get("embedding_service", lambda: EmbeddingService(get_encoder))
+
+
+def get_embedding_cache():
+    """Shared content-addressed embedding cache"""
+    return registry.get("embedding_cache", _load_embedding_cache)
+
+
+def get_chroma_client():
+    """Shared ChromaDB client"""
+    return registry.get("chroma_client", _load_chroma_client)
+
+
+def get_collection():
+    """Shared "user_docs" collection (one per encoder backend, so query and document vectors always match)"""
+    name = "user_docs" if config.EMBEDDING_BACKEND == "fp32" else f"user_docs_{config.EMBEDDING_BACKEND}"
+    return registry.get("chroma_collection", lambda: get_chroma_client().get_or_create_collection(name))
+
+
+_last_gc = 0.0
+_gc_lock = threading.Lock()
+
+
+def collect_stale_documents(force: bool = False) -> int:
+    """TTL garbage collection of the vector store, at most once per GC_INTERVAL_SECONDS"""
+    global _last_gc
+    from retrieval_mvp import delete_stale_documents
+    with _gc_lock:
+        now = time.time()
+        if not force and now - _last_gc < config.GC_INTERVAL_SECONDS:
+            return 0
+        _last_gc = now
+    removed = delete_stale_documents(get_collection(), config.CANDIDATE_TTL_HOURS * 3600, now)
+    if removed:
+        logging.info(f"Removed {removed} stale document chunks from the vector store")
+    return removed
+
+
+_last_touch = {}  # user_id -> when its chunks' last_seen was last refreshed
+_touch_lock = threading.Lock()
+
+
+def touch_candidate(user_id: str) -> bool:
+    """
+    Refresh last_seen on the candidate's chunks, at most once per CANDIDATE_TOUCH_SECONDS, so TTL
+    collection expires chunks by inactivity rather than by time since upload; True if it wrote
+    """
+    from retrieval_mvp import touch_documents
+    now = time.time()
+    with _touch_lock:
+        if now - _last_touch.get(user_id, 0.0) < config.CANDIDATE_TOUCH_SECONDS:
+            return False
+        _last_touch[user_id] = now
+        if len(_last_touch) > 10000:
+            for stale_id in [key for key, touched in _last_touch.items() if now - touched >= config.CANDIDATE_TOUCH_SECONDS]:
+                del _last_touch[stale_id]
+    touch_documents(get_collection(), user_id, int(now))
+    return True
+
+
+def get_llm():
+    """Shared LLM client; the connection/client setup is paid once per process"""
+    from llm_providers_mvp import create_llm
+    return registry.get("llm", lambda: create_llm(config.GOOGLE_API_KEY))
+
+
+def get_gateway():
+    """Shared LLM gateway, so the concurrency cap and rate limit apply across all sessions"""
+    from llm_gateway_mvp import LLMGateway
+    return registry.get("llm_gateway", lambda: LLMGateway(get_llm()))
+
+
+def get_scorer():
+    """Shared local answer scorer; the encoder is only loaded when the first summary is scored"""
+    from scoring_mvp import AnswerScorer
+    return registry.get("scorer", lambda: AnswerScorer(
+        encoder_provider=get_embedder if config.SCORING_EMBEDDINGS else None,
+        embedding_cache_provider=get_embedding_cache
+    ))
+
+
+def get_semantic_cache():
+    """Shared semantic question cache (SEMANTIC_CACHE=1), or None when disabled"""
+    if not config.SEMANTIC_CACHE:
+        return None
+    from semantic_cache_mvp import SemanticCache
+    return registry.get("semantic_cache", lambda: SemanticCache(encoder_provider=get_embedder))
+
+
+def get_question_bank(domain: str):
+    """Shared memory-mapped question bank for `domain`, or None when it has no bank file"""
+    from question_bank_mvp import QuestionBank, bank_paths
+    if not os.path.exists(bank_paths(domain)[0]):
+        return None
+    # A missing/stale index is built with the bare encoder on this thread: this runs under registry
+    # locks (this bank's and get_agent's), so it must not wait on the embedding service's worker
+    return registry.get(f"question_bank:{domain}", lambda: QuestionBank.load(
+        domain, encoder_provider=get_embedder, embedding_cache_provider=get_embedding_cache,
+        index_encoder_provider=get_encoder
+    ))
+
+
+def get_agent(domain: str):
+    """Pooled InterviewerAgent for `domain`, built once per process and reused across sessions"""
+    from agent_mvp import InterviewerAgent
+    return registry.get(f"agent:{domain}", lambda: InterviewerAgent(
+        domain, gateway=get_gateway(), scorer=get_scorer(), semantic_cache=get_semantic_cache(),
+        question_bank=get_question_bank(domain)
+    ))
+
+
+def get_session_store():
+    """Shared interview session store (SESSION_STORE)"""
+    from session_store_mvp import create_session_store
+    return registry.get("session_store", create_session_store)
+
+
+def get_prefetch_executor():
+    """Shared thread pool for speculative question generation"""
+    from concurrent.futures import ThreadPoolExecutor
+    return registry.get("prefetch_executor", lambda: ThreadPoolExecutor(
+        max_workers=config.PREFETCH_WORKERS, thread_name_prefix="prefetch"
+    ))
+
+
+def get_assessment_executor():
+    """Shared thread pool for background per-answer assessments (map-reduce summary)"""
+    from concurrent.futures import ThreadPoolExecutor
+    return registry.get("assessment_executor", lambda: ThreadPoolExecutor(
+        max_workers=config.ASSESSMENT_WORKERS, thread_name_prefix="assessment"
+    ))
+
+
+def get_extraction_pool():
+    """
+    Shared process pool for PDF extraction. Workers are spawned, not forked: this process runs many threads
+    (Streamlit, the gateway loop, the embedding worker, the session flusher, ...) and a forked child could
+    inherit a lock one of them held at fork time.
+    """
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    return registry.get("extraction_pool", lambda: ProcessPoolExecutor(
+        max_workers=config.EXTRACTION_WORKERS, mp_context=multiprocessing.get_context("spawn")
+    ))
+
+
+def recycle_extraction_pool(pool):
+    """Retire a pool whose workers are stuck on a hostile PDF; the next get_extraction_pool() starts a fresh one"""
+    if not registry.discard("extraction_pool", pool):
+        return  # another timeout already replaced it
+    logging.warning("Recycling the PDF extraction pool after a timeout")
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _load_pdf_parser():
+    import pdfplumber
+    return pdfplumber
+
+
+def warm_up():
+    """Load the encoder, vector store, PDF parser and LLM client up front so the first candidate doesn't pay for them"""
+    get_encoder()
+    get_embedder()
+    get_collection()
+    registry.get("pdf_parser", _load_pdf_parser)
+    get_gateway()
+    return registry.report()
+
+
+_warm_up_thread = None
+_warm_up_lock = threading.Lock()
+
+
+def start_warm_up_thread():
+    """Warm up in a daemon thread (once per process) so the landing page renders immediately"""
+    global _warm_up_thread
+    with _warm_up_lock:
+        if _warm_up_thread is None:
+            _warm_up_thread = threading.Thread(target=warm_up, name="resource-warm-up", daemon=True)
+            _warm_up_thread.start()
+    return _warm_up_thread
+
+
+if __name__ == "__main__":
+    # python resources_mvp.py -> load everything once and print load time / RSS
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(warm_up(), indent=2))
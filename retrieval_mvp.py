@@ -0,0 +1,82 @@
+"""
+Chunked resume/JD ingest and top-k retrieval of relevant passages per question
+"""
+import time
+
+import config_mvp as config
+
+
+def chunk_text(text: str, chunk_words: int = None, overlap_words: int = None) -> list:
+    """Split text into overlapping word windows"""
+    chunk_words = chunk_words or config.CHUNK_WORDS
+    overlap_words = config.CHUNK_OVERLAP_WORDS if overlap_words is None else overlap_words
+    words = (text or "").split()
+    if not words:
+        return []
+    step = max(1, chunk_words - overlap_words)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + chunk_words]))
+        if start + chunk_words >= len(words):
+            break
+    return chunks
+
+
+def build_documents(user_id: str, resume_text: str, jobdesc_text: str, profile_text: str, last_seen: int = 0):
+    """Chunked documents, metadata and ids ready for collection.upsert (last_seen drives TTL cleanup)"""
+    docs = []
+    metadatas = []
+    ids = []
+    for doc_type, text in (("resume", resume_text), ("jobdesc", jobdesc_text)):
+        for i, chunk in enumerate(chunk_text(text)):
+            docs.append(chunk)
+            metadatas.append({"type": doc_type, "user_id": user_id, "chunk": i, "last_seen": last_seen})
+            ids.append(f"{user_id}_{doc_type}_{i}")
+    if profile_text.strip():
+        docs.append(profile_text)
+        metadatas.append({"type": "profile", "user_id": user_id, "chunk": 0, "last_seen": last_seen})
+        ids.append(f"{user_id}_profile")
+    return docs, metadatas, ids
+
+
+def build_query(template_question: str, last_answer: str = "") -> str:
+    """What we search the candidate's documents with: the upcoming topic plus what they just said"""
+    return f"{template_question}\n{last_answer}".strip()
+
+
+def retrieve_passages(collection, encoder, user_id: str, query: str, k: int = None) -> list:
+    """Top-k resume/JD chunks for this user, as [{'type': ..., 'text': ...}] (profile is injected separately)"""
+    if not query:
+        return []
+    k = k or config.RETRIEVAL_TOP_K
+    query_embedding = encoder.encode([query]).tolist()
+    results = collection.query(
+        query_embeddings=query_embedding,
+        n_results=k,
+        where={"$and": [{"user_id": user_id}, {"type": {"$ne": "profile"}}]}
+    )
+    documents = (results.get("documents") or [[]])[0]
+    metadatas = (results.get("metadatas") or [[]])[0]
+    return [
+        {"type": metadata.get("type", ""), "text": document}
+        for document, metadata in zip(documents, metadatas)
+    ]
+
+
+def touch_documents(collection, user_id: str, last_seen: int) -> int:
+    """Set last_seen on every chunk of this user (an active session keeps its documents); returns how many"""
+    existing = collection.get(where={"user_id": user_id}, include=["metadatas"])
+    ids = existing.get("ids") or []
+    if ids:
+        collection.update(ids=ids, metadatas=[{**metadata, "last_seen": last_seen} for metadata in existing["metadatas"]])
+    return len(ids)
+
+
+def delete_stale_documents(collection, ttl_seconds: float, now: float = None) -> int:
+    """Remove every chunk whose candidate was last seen more than ttl_seconds ago; returns how many"""
+    cutoff = int((now if now is not None else time.time()) - ttl_seconds)
+    stale = collection.get(where={"last_seen": {"$lt": cutoff}}, include=[])
+    stale_ids = stale.get("ids") or []
+    if stale_ids:
+        collection.delete(ids=stale_ids)
+    return len(stale_ids)
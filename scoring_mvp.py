@@ -0,0 +1,139 @@
+"""
+Local per-answer scoring: rubric signals computed without an LLM call, in one encode batch per session
+"""
+import re
+from dataclasses import dataclass, asdict
+
+import config_mvp as config
+
+# Weight of each signal in an answer's 0-100 score; signals that can't be computed
+# (no encoder, no reference answer) are dropped and the rest renormalized
+WEIGHTS = {"relevance": 0.30, "reference": 0.25, "keywords": 0.20, "length": 0.10, "structure": 0.15}
+KEYWORDS_FOR_FULL_MARKS = 5
+EXAMPLE_MARKERS = ("for example", "for instance", "e.g.", "such as", "when i", "in my last", "at my previous")
+OUTCOME_MARKERS = ("result", "outcome", "improved", "reduced", "increased", "cut ", "saved", "led to", "learned")
+SENTENCE_SPLIT = re.compile(r"[.!?]+(?:\s|$)")
+NUMBER = re.compile(r"\d")
+
+
+@dataclass
+class AnswerScore:
+    score: int
+    relevance: float = None  # cosine(answer, question) mapped to 0-1
+    reference: float = None  # cosine(answer, reference answer) mapped to 0-1
+    keywords: float = 0.0
+    length: float = 0.0
+    structure: float = 0.0
+    matched_keywords: tuple = ()
+    words: int = 0
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data["matched_keywords"] = list(self.matched_keywords)
+        return data
+
+
+def _keyword_pattern(keyword: str):
+    return re.compile(r"(?<![a-z0-9])" + re.escape(keyword) + r"s?(?![a-z0-9])")
+
+
+def length_signal(words: int) -> float:
+    """0 for one-liners, 1 from ~60 to 300 words, gently lower for rambling answers"""
+    if words < 60:
+        return max(0.0, (words - 5) / 55)
+    if words <= 300:
+        return 1.0
+    return max(0.6, 1.0 - (words - 300) / 750)
+
+
+def structure_signal(text: str) -> float:
+    """Several sentences, a concrete example, numbers and an outcome: the STAR shape"""
+    lowered = text.lower()
+    sentences = [part for part in SENTENCE_SPLIT.split(text) if part.strip()]
+    return (0.3 * min(1.0, len(sentences) / 3)
+            + 0.3 * any(marker in lowered for marker in EXAMPLE_MARKERS)
+            + 0.2 * bool(NUMBER.search(text))
+            + 0.2 * any(marker in lowered for marker in OUTCOME_MARKERS))
+
+
+def _similarity_signal(cosine: float, floor: float) -> float:
+    # MiniLM cosines for on-topic answers sit around 0.3-0.7; spread that over 0-1
+    return min(1.0, max(0.0, (float(cosine) - floor) / 0.5))
+
+
+class AnswerScorer:
+    """
+    Scores every answer of a session at once. encoder_provider / embedding_cache_provider are
+    zero-arg callables (the shared resources), so nothing is loaded until the first score;
+    without an encoder only the lexical signals are used.
+    """
+
+    def __init__(self, encoder_provider=None, embedding_cache_provider=None):
+        self.encoder_provider = encoder_provider
+        self.embedding_cache_provider = embedding_cache_provider
+        self._keyword_patterns = {
+            domain: [(keyword, _keyword_pattern(keyword)) for keyword in info.get("keywords", [])]
+            for domain, info in config.DOMAIN_TEMPLATES.items()
+        }
+
+    def _embed(self, texts: list):
+        """L2-normalized embeddings for `texts` in a single batch (through the embedding cache if there is one)"""
+        import numpy as np
+        encoder = self.encoder_provider()
+        if self.embedding_cache_provider is not None:
+            vectors = self.embedding_cache_provider().encode(encoder, texts)
+        else:
+            vectors = np.asarray(encoder.encode(texts), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.maximum(norms, 1e-12)
+
+    def score_session(self, domain: str, qa_list: list) -> list:
+        """One AnswerScore per {'q', 'a'} in qa_list"""
+        if not qa_list:
+            return []
+        info = config.DOMAIN_TEMPLATES[domain]
+        references = dict(zip(info["questions"], info.get("reference_answers", [])))
+        answers = [qa['a'] for qa in qa_list]
+
+        relevance = [None] * len(qa_list)
+        reference = [None] * len(qa_list)
+        if self.encoder_provider is not None:
+            # Answers, questions and reference answers in one batch; the latter two are cache hits after the first session
+            texts = list(dict.fromkeys(answers + [qa['q'] for qa in qa_list] + list(references.values())))
+            row = {text: i for i, text in enumerate(texts)}
+            vectors = self._embed(texts)
+            answer_vectors = vectors[[row[answer] for answer in answers]]
+            question_vectors = vectors[[row[qa['q']] for qa in qa_list]]
+            cosines = (answer_vectors * question_vectors).sum(axis=1)
+            relevance = [_similarity_signal(cosine, 0.1) for cosine in cosines]
+            for i, qa in enumerate(qa_list):
+                if qa['q'] in references:
+                    reference[i] = _similarity_signal(float(answer_vectors[i] @ vectors[row[references[qa['q']]]]), 0.2)
+
+        scores = []
+        for i, answer in enumerate(answers):
+            lowered = answer.lower()
+            matched = tuple(keyword for keyword, pattern in self._keyword_patterns[domain] if pattern.search(lowered))
+            words = len(answer.split())
+            signals = {
+                "relevance": relevance[i],
+                "reference": reference[i],
+                "keywords": min(1.0, len(matched) / KEYWORDS_FOR_FULL_MARKS),
+                "length": length_signal(words),
+                "structure": structure_signal(answer),
+            }
+            available = {name: value for name, value in signals.items() if value is not None}
+            total_weight = sum(WEIGHTS[name] for name in available)
+            score = round(100 * sum(WEIGHTS[name] * value for name, value in available.items()) / total_weight)
+            scores.append(AnswerScore(
+                score=score,
+                **{name: None if value is None else round(value, 3) for name, value in signals.items()},
+                matched_keywords=matched,
+                words=words,
+            ))
+        return scores
+
+
+def overall_score(scores: list) -> int:
+    """Mean of the per-answer scores (0 when nothing was answered)"""
+    return round(sum(score.score for score in scores) / len(scores)) if scores else 0
@@ -0,0 +1,128 @@
+"""
+Semantic cache for generated interview questions: near-identical question contexts reuse an earlier question
+"""
+import re
+import time
+import functools
+import threading
+from collections import OrderedDict, defaultdict
+
+import config_mvp as config
+
+
+def question_context(session, question_num: int, template_question: str, conversation: str,
+                     context_passages: list = None) -> str:
+    """
+    The part of a question prompt that decides what gets asked, most decisive first
+    (the encoder truncates long inputs): template question, last answer, profile, resume/JD passages.
+    """
+    last_turn = conversation[-600:] if conversation else "Interview just started."
+    profile = session.profile
+    passages = " ".join(p['text'] for p in context_passages or [])
+    return (f"Question {question_num}: {template_question}\n{last_turn}\n"
+            f"Background: {profile.get('background', '')} Goals: {profile.get('goals', '')}\n{passages[:500]}")
+
+
+# Capitalized words that don't start a sentence: names, companies, schools, products
+CAPITALIZED = re.compile(r"(?<![.!?\n]\s)(?<!^)\b[A-Z][\w&+-]*", re.MULTILINE)
+WORD = re.compile(r"[\w&+-]+")
+
+
+@functools.lru_cache(maxsize=1)
+def _generic_vocabulary() -> frozenset:
+    """Words of the domain templates (personas, questions, reference answers): capitalized or not, never identifying"""
+    texts = []
+    for info in config.DOMAIN_TEMPLATES.values():
+        texts += [info["name"], info["persona"], *info["questions"], *info.get("reference_answers", [])]
+    return frozenset(word.lower() for text in texts for word in WORD.findall(text))
+
+
+def personal_terms(session, resume_text: str = "", jobdesc_text: str = "", context_passages: list = None) -> set:
+    """
+    Lower-cased terms that identify this candidate: name parts and capitalized words (companies, schools,
+    products, people) from the profile, answers, resume and job description that the templates never use
+    """
+    profile = session.profile
+    terms = {part.lower() for part in WORD.findall(profile.get('name', '')) if len(part) > 1}
+    sources = [profile.get('background', ''), profile.get('goals', ''), resume_text, jobdesc_text,
+               *(response['answer'] for response in session.responses),
+               *(passage['text'] for passage in context_passages or [])]
+    generic = _generic_vocabulary()
+    for text in sources:
+        terms.update(word.lower() for word in CAPITALIZED.findall(text or "") if word.lower() not in generic)
+    return terms
+
+
+def is_shareable(question: str, terms: set) -> bool:
+    """Whether a generated question can be served to other candidates: it mentions none of `terms`"""
+    return not any(word.lower() in terms for word in WORD.findall(question))
+
+
+class SemanticCache:
+    """
+    Partitioned (domain, question_num) cache of generated questions keyed by context embeddings.
+    A lookup returns the cached question whose context has cosine similarity >= `threshold`;
+    each partition keeps at most `capacity` entries (least recently used evicted first) for `ttl_seconds`.
+    Cached questions are served to other candidates, so callers only store questions that pass is_shareable().
+    """
+
+    def __init__(self, encoder_provider, threshold: float = None, capacity: int = None, ttl_seconds: float = None):
+        self.encoder_provider = encoder_provider
+        self.threshold = config.SEMANTIC_CACHE_THRESHOLD if threshold is None else threshold
+        self.capacity = capacity or config.SEMANTIC_CACHE_SIZE
+        self.ttl_seconds = config.SEMANTIC_CACHE_TTL_SECONDS if ttl_seconds is None else ttl_seconds
+        self._lock = threading.Lock()
+        self._partitions = defaultdict(OrderedDict)  # (domain, question_num) -> {entry id: (vector, question, created)}
+        self._next_id = 0
+        self.counters = defaultdict(lambda: {"hits": 0, "misses": 0})  # per domain
+
+    def embed(self, text: str):
+        import numpy as np
+        vector = np.asarray(self.encoder_provider().encode([text])[0], dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def lookup(self, domain: str, question_num: int, vector):
+        """(question, similarity) of the closest fresh entry above the threshold, else (None, best similarity)"""
+        import numpy as np
+        now = time.monotonic()
+        with self._lock:
+            partition = self._partitions[(domain, question_num)]
+            for entry_id in [entry_id for entry_id, (_, _, created) in partition.items() if now - created > self.ttl_seconds]:
+                del partition[entry_id]
+            best_id, best = None, 0.0
+            if partition:
+                ids = list(partition)
+                similarities = np.stack([partition[entry_id][0] for entry_id in ids]) @ vector
+                index = int(np.argmax(similarities))
+                best_id, best = ids[index], float(similarities[index])
+            if best_id is not None and best >= self.threshold:
+                partition.move_to_end(best_id)
+                self.counters[domain]["hits"] += 1
+                return partition[best_id][1], best
+            self.counters[domain]["misses"] += 1
+            return None, best
+
+    def store(self, domain: str, question_num: int, vector, question: str):
+        with self._lock:
+            partition = self._partitions[(domain, question_num)]
+            partition[self._next_id] = (vector, question, time.monotonic())
+            self._next_id += 1
+            while len(partition) > self.capacity:
+                partition.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._partitions.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            hits = sum(counts["hits"] for counts in self.counters.values())
+            lookups = hits + sum(counts["misses"] for counts in self.counters.values())
+            return {
+                "hits": hits,
+                "misses": lookups - hits,
+                "hit_rate": round(hits / lookups, 3) if lookups else None,
+                "entries": sum(len(partition) for partition in self._partitions.values()),
+                "threshold": self.threshold,
+                "by_domain": {domain: dict(counts) for domain, counts in self.counters.items()},
+            }
@@ -0,0 +1,227 @@
+"""
+Interview session stores: serialized InterviewSession state keyed by session ID, so an interview
+survives worker restarts and can be resumed on any worker behind a plain load balancer
+"""
+import os
+import json
+import time
+import zlib
+import atexit
+import sqlite3
+import hashlib
+import logging
+import threading
+
+import config_mvp as config
+
+# Resume/JD/profile text can be tens of KB and never changes during an interview: stored once, compressed,
+# content-addressed, instead of being rewritten with every turn
+LARGE_FIELDS = ("resume_text", "jobdesc_text", "profile_text")
+
+
+class MemorySessionStore:
+    """Process-local store (survives browser reloads, not restarts); states are copied in and out as JSON"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = {}  # session_id -> (updated, JSON)
+        self._last_purge = time.monotonic()
+
+    def load(self, session_id: str):
+        with self._lock:
+            entry = self._states.get(session_id)
+        return json.loads(entry[1]) if entry else None
+
+    def save(self, session_id: str, state: dict):
+        payload = json.dumps(state)
+        with self._lock:
+            self._states[session_id] = (time.time(), payload)
+        if time.monotonic() - self._last_purge >= config.GC_INTERVAL_SECONDS:
+            self._last_purge = time.monotonic()
+            self.purge(config.SESSION_TTL_HOURS * 3600)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._states.pop(session_id, None)
+
+    def purge(self, ttl_seconds: float) -> int:
+        cutoff = time.time() - ttl_seconds
+        with self._lock:
+            stale = [session_id for session_id, (updated, _) in self._states.items() if updated < cutoff]
+            for session_id in stale:
+                del self._states[session_id]
+        return len(stale)
+
+    def flush(self):
+        pass
+
+    def stats(self) -> dict:
+        return {"backend": "memory", "sessions": len(self._states)}
+
+
+class SQLiteSessionStore:
+    """
+    SQLite (WAL mode, so several worker processes can read while one writes) with write-behind:
+    save() only records the latest state per session, and a flusher thread writes everything pending
+    in one transaction every `flush_seconds` (or as soon as `batch_size` sessions are pending).
+    load() sees pending writes of this process immediately.
+    """
+
+    def __init__(self, path: str = None, flush_seconds: float = None, batch_size: int = None):
+        self.path = path or config.SESSION_DB_PATH
+        self.flush_seconds = config.SESSION_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        self.batch_size = batch_size or config.SESSION_BATCH_SIZE
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._db_lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, timeout=10)
+        with self._db_lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute("CREATE TABLE IF NOT EXISTS sessions ("
+                             "session_id TEXT PRIMARY KEY, updated REAL NOT NULL, state BLOB NOT NULL)")
+            self._db.execute("CREATE TABLE IF NOT EXISTS blobs (hash TEXT PRIMARY KEY, data BLOB NOT NULL)")
+        self._pending_lock = threading.Lock()
+        self._pending = {}  # session_id -> (updated, state dict)
+        self._wake = threading.Event()
+        self._closed = False
+        self.counters = {"saves": 0, "writes": 0, "flushes": 0}
+        self._flusher = threading.Thread(target=self._flush_loop, name="session-store-flusher", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    # --- encoding ---
+
+    def _encode(self, state: dict):
+        """
+        (compressed state without the large texts, {hash: compressed text} blobs it references).
+        Every referenced blob is written with every flush (INSERT OR IGNORE): another worker's purge
+        may have dropped a blob this process wrote earlier, so nothing can be assumed to be stored.
+        """
+        state = dict(state)
+        blobs = {}
+        for name in LARGE_FIELDS:
+            text = state.get(name)
+            if text:
+                digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+                blobs[digest] = zlib.compress(text.encode("utf-8"))
+                state[name] = {"blob": digest}
+        return zlib.compress(json.dumps(state).encode("utf-8")), blobs
+
+    def _decode(self, data: bytes) -> dict:
+        state = json.loads(zlib.decompress(data))
+        for name in LARGE_FIELDS:
+            ref = state.get(name)
+            if isinstance(ref, dict):
+                with self._db_lock:
+                    row = self._db.execute("SELECT data FROM blobs WHERE hash = ?", (ref["blob"],)).fetchone()
+                state[name] = zlib.decompress(row[0]).decode("utf-8") if row else ""
+        return state
+
+    # --- public API ---
+
+    def load(self, session_id: str):
+        with self._pending_lock:
+            pending = self._pending.get(session_id)
+        if pending is not None:
+            return json.loads(json.dumps(pending[1]))  # a copy, like a state read back from disk
+        with self._db_lock:
+            row = self._db.execute("SELECT state FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+        return self._decode(row[0]) if row else None
+
+    def save(self, session_id: str, state: dict):
+        with self._pending_lock:
+            self._pending[session_id] = (time.time(), json.loads(json.dumps(state)))
+            self.counters["saves"] += 1
+            full = len(self._pending) >= self.batch_size
+        if full:
+            self._wake.set()
+
+    def delete(self, session_id: str):
+        with self._pending_lock:
+            self._pending.pop(session_id, None)
+        with self._db_lock, self._db:
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+
+    def flush(self):
+        """Write every pending state in one transaction"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        rows, blobs = [], {}
+        for session_id, (updated, state) in pending.items():
+            data, new_blobs = self._encode(state)
+            rows.append((session_id, updated, data))
+            blobs.update(new_blobs)
+        try:
+            with self._db_lock, self._db:
+                self._db.executemany("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", blobs.items())
+                self._db.executemany(
+                    "INSERT INTO sessions (session_id, updated, state) VALUES (?, ?, ?) "
+                    "ON CONFLICT(session_id) DO UPDATE SET updated = excluded.updated, state = excluded.state",
+                    rows
+                )
+        except sqlite3.Error:
+            # Put the states back (unless a newer save arrived meanwhile) so the next flush retries them
+            with self._pending_lock:
+                for session_id, entry in pending.items():
+                    self._pending.setdefault(session_id, entry)
+            raise
+        self.counters["writes"] += len(rows)
+        self.counters["flushes"] += 1
+
+    def purge(self, ttl_seconds: float) -> int:
+        """Drop sessions idle for longer than ttl_seconds, and the texts nobody references any more"""
+        cutoff = time.time() - ttl_seconds
+        with self._db_lock, self._db:
+            removed = self._db.execute("DELETE FROM sessions WHERE updated < ?", (cutoff,)).rowcount
+            if removed:
+                referenced = set()
+                for (data,) in self._db.execute("SELECT state FROM sessions"):
+                    state = json.loads(zlib.decompress(data))
+                    referenced.update(state[name]["blob"] for name in LARGE_FIELDS if isinstance(state.get(name), dict))
+                orphans = [(digest,) for (digest,) in self._db.execute("SELECT hash FROM blobs") if digest not in referenced]
+                self._db.executemany("DELETE FROM blobs WHERE hash = ?", orphans)
+        return removed
+
+    def _flush_loop(self):
+        last_purge = time.monotonic()
+        while not self._closed:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            try:
+                self.flush()
+                if time.monotonic() - last_purge >= config.GC_INTERVAL_SECONDS:
+                    last_purge = time.monotonic()
+                    self.purge(config.SESSION_TTL_HOURS * 3600)
+            except sqlite3.Error as e:
+                logging.warning(f"Session store flush failed, will retry: {e}")
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
+
+    def stats(self) -> dict:
+        with self._pending_lock:
+            pending = len(self._pending)
+        with self._db_lock:
+            sessions = self._db.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+        return {"backend": "sqlite", "path": self.path, "sessions": sessions, "pending": pending, **self.counters}
+
+
+STORES = {
+    "memory": lambda: MemorySessionStore(),
+    "sqlite": lambda: SQLiteSessionStore(),
+}
+
+
+def create_session_store(backend: str = None):
+    """Session store for the configured SESSION_STORE ("sqlite" or "memory")"""
+    backend = backend or config.SESSION_STORE
+    if backend not in STORES:
+        raise ValueError(f"Unknown SESSION_STORE {backend!r}, expected one of {sorted(STORES)}")
+    return STORES[backend]()
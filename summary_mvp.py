@@ -0,0 +1,159 @@
+"""
+Structured interview summary: the model answers in JSON, which is validated into an InterviewSummary
+"""
+import re
+import json
+import math
+from dataclasses import dataclass, field, asdict
+
+SCORE_PATTERN = re.compile(r"score\s*[:\-]?\s*(\d{1,3})\s*/\s*100", re.IGNORECASE)
+RECOMMENDATIONS = ("Hire", "Maybe", "Prepare and try again")
+LIST_FIELDS = ("key_strengths", "areas_for_development", "pitfalls", "resources")
+
+SUMMARY_SCHEMA = """{
+  "overall_assessment": "2-3 sentences",
+  "key_strengths": ["3-4 short bullet points"],
+  "areas_for_development": ["2-3 short bullet points"],
+  "pitfalls": ["mistakes to avoid"],
+  "resources": ["websites/sources/links to study from"],
+  "recommendation": "Hire" | "Maybe" | "Prepare and try again",
+  "recommendation_reason": "one sentence",
+  "score": integer from 0 to 100
+}"""
+
+
+class SummaryFormatError(ValueError):
+    """The model's summary wasn't valid JSON or didn't match SUMMARY_SCHEMA"""
+
+
+def extract_score(summary: str):
+    """Pull the "score NN/100" value out of a free-form summary, or None if missing"""
+    score_match = SCORE_PATTERN.search(summary or "")
+    if score_match:
+        return int(score_match.group(1))
+    return None
+
+
+@dataclass
+class InterviewSummary:
+    overall_assessment: str = ""
+    key_strengths: list = field(default_factory=list)
+    areas_for_development: list = field(default_factory=list)
+    pitfalls: list = field(default_factory=list)
+    resources: list = field(default_factory=list)
+    recommendation: str = ""
+    recommendation_reason: str = ""
+    score: int = None
+    raw_text: str = ""  # only set when the model never produced valid JSON
+
+    def to_markdown(self) -> str:
+        if self.raw_text:
+            return self.raw_text
+        parts = []
+        if self.overall_assessment:
+            parts.append(f"**1. Overall Assessment**\n{self.overall_assessment}")
+        for number, title, items in ((2, "Key Strengths", self.key_strengths),
+                                     (3, "Areas for Development", self.areas_for_development),
+                                     (4, "Pitfalls", self.pitfalls + self.resources)):
+            if items:
+                parts.append(f"**{number}. {title}**\n" + "\n".join(f"- {item}" for item in items))
+        if self.recommendation:
+            reason = f" - {self.recommendation_reason}" if self.recommendation_reason else ""
+            parts.append(f"**5. Recommendation**\n{self.recommendation}{reason}")
+        if self.score is not None:
+            parts.append(f"Interview score: {self.score}/100")
+        return "\n\n".join(parts)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        return cls(**{key: value for key, value in data.items() if key in cls.__dataclass_fields__})
+
+    @classmethod
+    def from_text(cls, text: str):
+        """Fallback for a free-form (non-JSON) summary: shown as-is, score pulled out with the old regex"""
+        return cls(raw_text=text, score=extract_score(text))
+
+
+def _json_object_text(text: str) -> str:
+    """The {...} part of a reply, dropping ```json fences or chatter around it"""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise SummaryFormatError("No JSON object in the reply")
+    return text[start:end + 1]
+
+
+def _as_list(value, name: str, problems: list) -> list:
+    if isinstance(value, str):
+        return [value] if value.strip() else []
+    if not isinstance(value, list):
+        problems.append(f"{name} must be a list of strings")
+        return []
+    return [str(item).strip() for item in value if str(item).strip()]
+
+
+def validate_summary(data) -> InterviewSummary:
+    """Check a decoded reply against SUMMARY_SCHEMA (coercing harmless deviations); raises SummaryFormatError"""
+    if not isinstance(data, dict):
+        raise SummaryFormatError("The summary must be a JSON object")
+    problems = []
+    summary = InterviewSummary()
+    summary.overall_assessment = str(data.get("overall_assessment") or "").strip()
+    if not summary.overall_assessment:
+        problems.append("overall_assessment is missing")
+    for name in LIST_FIELDS:
+        setattr(summary, name, _as_list(data.get(name, []), name, problems))
+    recommendation = str(data.get("recommendation") or "").strip()
+    matches = [choice for choice in RECOMMENDATIONS if choice.lower() == recommendation.lower()]
+    if matches:
+        summary.recommendation = matches[0]
+    else:
+        problems.append(f"recommendation must be one of {', '.join(RECOMMENDATIONS)}")
+    summary.recommendation_reason = str(data.get("recommendation_reason") or "").strip()
+    score = data.get("score")
+    try:
+        if isinstance(score, bool):
+            raise TypeError("score is a boolean")  # float(True) == 1.0
+        score = float(score)
+    except (TypeError, ValueError):
+        problems.append("score must be a number")
+    else:
+        if not math.isfinite(score):
+            problems.append("score must be a finite number")  # 1e999 decodes to inf, round() would overflow
+        elif not 0 <= score <= 100:
+            problems.append("score must be between 0 and 100")
+        else:
+            summary.score = round(score)
+    if problems:
+        raise SummaryFormatError("; ".join(problems))
+    return summary
+
+
+def parse_summary(text: str) -> InterviewSummary:
+    """Decode and validate a complete model reply"""
+    try:
+        data = json.loads(_json_object_text(text))
+    except json.JSONDecodeError as e:
+        raise SummaryFormatError(f"Invalid JSON: {e}") from e
+    return validate_summary(data)
+
+
+def parse_partial_summary(text: str):
+    """Best-effort InterviewSummary from a reply that is still streaming in, or None if nothing is usable yet"""
+    start = text.find("{")
+    if start == -1:
+        return None
+    try:
+        from langchain_core.utils.json import parse_partial_json
+    except ImportError:
+        return None
+    data = parse_partial_json(text[start:])
+    if not isinstance(data, dict):
+        return None
+    summary = InterviewSummary.from_dict({key: value for key, value in data.items() if key != "score"})
+    for name in LIST_FIELDS:
+        value = getattr(summary, name)
+        setattr(summary, name, [value] if isinstance(value, str) else [str(item) for item in value or []])
+    return summary
@@ -0,0 +1,213 @@
+"""
+Per-stage timing and token-usage spans with pluggable sinks (in-memory, JSONL, Prometheus text)
+"""
+import json
+import time
+import logging
+import threading
+from collections import deque, defaultdict
+from contextlib import contextmanager
+
+import config_mvp as config
+
+
+class Span:
+    """One timed stage; attributes (tokens, prompt chars, cache hits, ...) can be added while it runs"""
+
+    def __init__(self, name: str, attrs: dict):
+        self.name = name
+        self.attrs = dict(attrs)
+        self.started = time.time()
+        self.wall_ms = None
+        self.error = None
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def to_dict(self) -> dict:
+        record = {"span": self.name, "ts": round(self.started, 3), "wall_ms": self.wall_ms, **self.attrs}
+        if self.error:
+            record["error"] = self.error
+        return record
+
+
+class MemorySink:
+    """Keeps the most recent spans for the admin panel"""
+
+    def __init__(self, size: int = 500):
+        self.spans = deque(maxlen=size)
+
+    def emit(self, span: Span):
+        self.spans.append(span.to_dict())
+
+    def recent(self, n: int = 20) -> list:
+        return list(self.spans)[-n:]
+
+    def aggregate(self) -> dict:
+        """Per-span count / p50 / p95 wall time over the buffered spans"""
+        by_name = defaultdict(list)
+        for record in list(self.spans):
+            by_name[record["span"]].append(record["wall_ms"])
+        stats = {}
+        for name, values in by_name.items():
+            values.sort()
+            stats[name] = {
+                "count": len(values),
+                "p50_ms": values[len(values) // 2],
+                "p95_ms": values[min(len(values) - 1, int(len(values) * 0.95))],
+            }
+        return stats
+
+
+class JsonlSink:
+    """Appends one JSON object per span to a file"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def emit(self, span: Span):
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+class PrometheusSink:
+    """Cumulative counters per span, rendered in the Prometheus text exposition format"""
+
+    NUMERIC_ATTRS = ("prompt_tokens", "completion_tokens", "prompt_chars")
+    TOKEN_ATTRS = ("prompt_tokens", "completion_tokens")  # labelled estimated="true" unless the provider reported them
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = defaultdict(int)
+        self.errors = defaultdict(int)
+        self.seconds = defaultdict(float)
+        self.cache_hits = defaultdict(int)
+        self.totals = defaultdict(float)  # (span, attr, estimated label or "") -> sum
+
+    def emit(self, span: Span):
+        with self._lock:
+            self.counts[span.name] += 1
+            self.seconds[span.name] += (span.wall_ms or 0) / 1000
+            if span.error:
+                self.errors[span.name] += 1
+            if span.attrs.get("cache_hit"):
+                self.cache_hits[span.name] += 1
+            estimated = "true" if span.attrs.get("tokens_estimated", True) else "false"
+            for attr in self.NUMERIC_ATTRS:
+                if isinstance(span.attrs.get(attr), (int, float)):
+                    self.totals[(span.name, attr, estimated if attr in self.TOKEN_ATTRS else "")] += span.attrs[attr]
+
+    def render(self) -> str:
+        with self._lock:
+            lines = [
+                "# TYPE interview_span_total counter",
+                *(f'interview_span_total{{span="{name}"}} {count}' for name, count in self.counts.items()),
+                "# TYPE interview_span_seconds_total counter",
+                *(f'interview_span_seconds_total{{span="{name}"}} {value:.6f}' for name, value in self.seconds.items()),
+                "# TYPE interview_span_errors_total counter",
+                *(f'interview_span_errors_total{{span="{name}"}} {value}' for name, value in self.errors.items()),
+                "# TYPE interview_span_cache_hits_total counter",
+                *(f'interview_span_cache_hits_total{{span="{name}"}} {value}' for name, value in self.cache_hits.items()),
+            ]
+            for attr in self.NUMERIC_ATTRS:
+                lines.append(f"# TYPE interview_{attr}_total counter")
+                lines.extend(
+                    f'interview_{attr}_total{{span="{name}"' + (f',estimated="{estimated}"' if estimated else "") + f'}} {value:g}'
+                    for (name, total_attr, estimated), value in self.totals.items() if total_attr == attr
+                )
+        return "\n".join(lines) + "\n"
+
+
+class Telemetry:
+    def __init__(self, sinks: list = None):
+        self.sinks = sinks or []
+
+    def add_sink(self, sink):
+        self.sinks.append(sink)
+        return sink
+
+    def sink(self, sink_type):
+        return next((sink for sink in self.sinks if isinstance(sink, sink_type)), None)
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        current = Span(name, attrs)
+        start = time.perf_counter()
+        try:
+            yield current
+        except Exception as e:
+            current.error = type(e).__name__
+            raise
+        finally:
+            current.wall_ms = round((time.perf_counter() - start) * 1000, 3)
+            for sink in self.sinks:
+                try:
+                    sink.emit(current)
+                except Exception as e:
+                    logging.warning(f"Telemetry sink {type(sink).__name__} failed: {e}")
+
+
+def _configured_sinks() -> list:
+    sinks = []
+    for name in (part.strip() for part in config.TELEMETRY_SINKS.split(",")):
+        if name == "memory":
+            sinks.append(MemorySink())
+        elif name == "jsonl":
+            sinks.append(JsonlSink(config.TELEMETRY_JSONL_PATH))
+        elif name == "prometheus":
+            sinks.append(PrometheusSink())
+        elif name:
+            logging.warning(f"Unknown telemetry sink {name!r}")
+    if config.METRICS_PORT and not any(isinstance(sink, PrometheusSink) for sink in sinks):
+        # A metrics endpoint needs something to serve: count from start-up rather than serve nothing
+        logging.info("METRICS_PORT is set, adding the prometheus telemetry sink")
+        sinks.append(PrometheusSink())
+    return sinks
+
+
+telemetry = Telemetry(_configured_sinks())
+span = telemetry.span
+
+_metrics_server = None
+_metrics_lock = threading.Lock()
+
+
+def start_metrics_server(port: int = None):
+    """
+    Serve the Prometheus sink at http://0.0.0.0:<port>/metrics from a daemon thread (once per process);
+    the sink is added if TELEMETRY_SINKS didn't list it
+    """
+    global _metrics_server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    port = port or config.METRICS_PORT
+    if not port:
+        return None
+    prometheus = telemetry.sink(PrometheusSink) or telemetry.add_sink(PrometheusSink())
+
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = prometheus.render().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    with _metrics_lock:
+        if _metrics_server is None:
+            try:
+                _metrics_server = ThreadingHTTPServer(("0.0.0.0", port), MetricsHandler)
+            except OSError as e:
+                # Another Streamlit worker on this host already serves it
+                logging.warning(f"Metrics endpoint not started on port {port}: {e}")
+                return None
+            threading.Thread(target=_metrics_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _metrics_server
@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+
+from embedding_cache_mvp import EmbeddingCache
+
+
+class CountingEncoder:
+    """Deterministic 4-d vectors derived from the text; counts how many texts it encoded"""
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, **kwargs):
+        self.encoded += len(texts)
+        return np.array([[len(text), sum(map(ord, text)) % 101, text.count("x"), 1.0] for text in texts], dtype=np.float32)
+
+
+def expected(texts):
+    return CountingEncoder().encode(texts)
+
+
+def test_hits_skip_the_encoder(tmp_path):
+    cache, encoder = EmbeddingCache("model", str(tmp_path), capacity=8), CountingEncoder()
+    np.testing.assert_array_equal(cache.encode(encoder, ["a", "bb", "a"]), expected(["a", "bb", "a"]))
+    assert encoder.encoded == 2
+    np.testing.assert_array_equal(cache.encode(encoder, ["bb", "a"]), expected(["bb", "a"]))
+    assert encoder.encoded == 2
+    assert cache.stats()["entries"] == 2
+
+
+def test_second_instance_sees_the_first_ones_writes(tmp_path):
+    first, second, encoder = EmbeddingCache("model", str(tmp_path), 8), EmbeddingCache("model", str(tmp_path), 8), CountingEncoder()
+    first.encode(encoder, ["one", "two"])
+    encoded = encoder.encoded
+    np.testing.assert_array_equal(second.encode(encoder, ["two", "one"]), expected(["two", "one"]))
+    assert encoder.encoded == encoded
+    assert second.stats()["hits"] == 2
+
+
+def test_least_recently_used_row_is_evicted_across_instances(tmp_path):
+    first, second, encoder = EmbeddingCache("model", str(tmp_path), 4), EmbeddingCache("model", str(tmp_path), 4), CountingEncoder()
+    first.encode(encoder, ["x1", "x2", "x3", "x4"])
+    time.sleep(0.01)
+    second.encode(encoder, ["x1"])  # x1 is now the most recently used
+    time.sleep(0.01)
+    first.encode(encoder, ["x5"])  # evicts x2, the least recently used
+    encoder.encoded = 0
+    np.testing.assert_array_equal(second.encode(encoder, ["x1", "x3", "x4", "x5"]), expected(["x1", "x3", "x4", "x5"]))
+    assert encoder.encoded == 0
+    second.encode(encoder, ["x2"])
+    assert encoder.encoded == 1
+    assert first.stats()["entries"] == 4
+
+
+def test_index_is_only_reread_after_another_instance_wrote(tmp_path):
+    first, second, encoder = EmbeddingCache("model", str(tmp_path), 8), EmbeddingCache("model", str(tmp_path), 8), CountingEncoder()
+    first.encode(encoder, ["a"])
+    second.encode(encoder, ["a"])
+    generation = second._generation
+    second.encode(encoder, ["a"])
+    assert second._generation == generation
+    first.encode(encoder, ["b"])
+    second.encode(encoder, ["b"])
+    assert second._generation > generation
+
+
+def test_reopened_cache_keeps_its_rows(tmp_path):
+    cache, encoder = EmbeddingCache("model", str(tmp_path), 8), CountingEncoder()
+    cache.encode(encoder, ["persisted"])
+    cache.flush()
+    encoder.encoded = 0
+    reopened = EmbeddingCache("model", str(tmp_path), 8)
+    np.testing.assert_array_equal(reopened.encode(encoder, ["persisted"]), expected(["persisted"]))
+    assert encoder.encoded == 0
+
+
+def test_in_memory_cache():
+    cache, encoder = EmbeddingCache("model", "", capacity=2), CountingEncoder()
+    cache.encode(encoder, ["a", "b", "c"])
+    assert cache.stats()["entries"] == 2
+    np.testing.assert_array_equal(cache.encode(encoder, ["c"]), expected(["c"]))
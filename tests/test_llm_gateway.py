@@ -0,0 +1,123 @@
+import time
+import asyncio
+
+import pytest
+
+from llm_gateway_mvp import CircuitBreaker, CircuitOpenError, LLMGateway, LLMGatewayError
+from llm_providers_mvp import StubLLM
+
+
+class FlakyBackend:
+    """Fails with `error` for the first `failures` calls, then answers "ok" after `delay` seconds"""
+
+    def __init__(self, failures: int = 0, error: str = "503 unavailable", delay: float = 0.0):
+        self.failures = failures
+        self.error = error
+        self.delay = delay
+        self.calls = 0
+
+    async def ainvoke(self, prompt):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise RuntimeError(self.error)
+        return "ok"
+
+
+def make_gateway(backend, **kwargs):
+    options = dict(max_concurrency=4, rate_per_second=1000, burst=100, max_retries=3, backoff_base=0.001,
+                   backoff_max=0.001, deadline_seconds=5, breaker=CircuitBreaker(100, 60))
+    options.update(kwargs)
+    return LLMGateway(backend, **options)
+
+
+def test_retryable_failures_are_retried():
+    backend = FlakyBackend(failures=2)
+    gateway = make_gateway(backend)
+    assert gateway.invoke("prompt") == "ok"
+    assert backend.calls == 3
+    assert gateway.counters["retries"] == 2
+    assert gateway.counters["succeeded"] == 1
+
+
+def test_non_retryable_failure_is_not_retried():
+    backend = FlakyBackend(failures=1, error="400 invalid argument")
+    gateway = make_gateway(backend)
+    with pytest.raises(LLMGatewayError):
+        gateway.invoke("prompt")
+    assert backend.calls == 1
+
+
+def test_retries_stop_after_max_retries():
+    backend = FlakyBackend(failures=10)
+    gateway = make_gateway(backend, max_retries=2)
+    with pytest.raises(LLMGatewayError, match="after 3 attempts"):
+        gateway.invoke("prompt")
+    assert backend.calls == 3
+
+
+def test_deadline():
+    gateway = make_gateway(FlakyBackend(delay=1.0), deadline_seconds=0.1)
+    start = time.monotonic()
+    with pytest.raises(LLMGatewayError, match="deadline"):
+        gateway.invoke("prompt")
+    assert time.monotonic() - start < 0.5
+
+
+def test_breaker_opens_then_admits_one_trial_call():
+    backend = FlakyBackend(failures=1, delay=0.05)
+    gateway = make_gateway(backend, max_retries=0, breaker=CircuitBreaker(1, 0.1))
+
+    async def scenario():
+        with pytest.raises(LLMGatewayError):
+            await gateway.ainvoke("prompt")
+        assert gateway.breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            await gateway.ainvoke("prompt")
+        await asyncio.sleep(0.12)
+        assert gateway.breaker.state == "half-open"
+        results = await asyncio.gather(*(gateway.ainvoke("prompt") for _ in range(5)), return_exceptions=True)
+        return results
+
+    results = asyncio.run(scenario())
+    assert results[0] == "ok"
+    assert all(isinstance(result, CircuitOpenError) for result in results[1:])
+    assert backend.calls == 2
+    assert gateway.breaker.state == "closed"
+    assert not gateway.breaker.trial_in_flight
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker(1, 0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    assert breaker.check() is True
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    breaker.record_failure()
+    breaker.end_trial()
+    assert breaker.state == "open"
+
+
+def test_stream_yields_the_stub_reply():
+    gateway = make_gateway(StubLLM(first_token_ms=0, jitter_ms=0, tokens_per_second=10000, error_rate=0))
+    prompt = 'Suggested question from the template (optional): "Why us?"'
+    assert "".join(gateway.stream(prompt)).strip() == "Great, thanks. Why us?"
+
+
+def test_closing_a_stream_early_releases_its_slot():
+    stub = StubLLM(first_token_ms=0, jitter_ms=0, tokens_per_second=20, error_rate=0)
+    gateway = make_gateway(stub, max_concurrency=1, deadline_seconds=2)
+    prompt = 'Suggested question from the template (optional): "Tell me about a long project you led?"'
+    chunks = gateway.stream(prompt)
+    next(chunks)
+    assert gateway.in_flight == 1
+    chunks.close()
+    deadline = time.monotonic() + 1
+    while gateway.in_flight and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert gateway.in_flight == 0
+    # The single slot is free again: a new call doesn't wait for the abandoned stream's deadline
+    start = time.monotonic()
+    assert gateway.invoke("short prompt")
+    assert time.monotonic() - start < 1
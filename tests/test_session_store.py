@@ -0,0 +1,76 @@
+import time
+
+from session_store_mvp import SQLiteSessionStore
+
+STATE = {
+    "user_id": "abc",
+    "page": "interview",
+    "qa_list": [{"q": "Why us?", "a": "Because."}],
+    "resume_text": "Ten years of backend work. " * 200,
+    "jobdesc_text": "We are hiring a staff engineer.",
+    "profile_text": "",
+}
+
+
+def test_pending_state_is_visible_before_the_flush(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), flush_seconds=60)
+    try:
+        store.save("abc", STATE)
+        assert store.load("abc") == STATE
+        assert store.stats()["sessions"] == 0
+    finally:
+        store.close()
+
+
+def test_close_flushes_and_a_new_store_reloads(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    store = SQLiteSessionStore(path, flush_seconds=60)
+    store.save("abc", STATE)
+    store.save("abc", {**STATE, "page": "summary"})  # only the latest state is written
+    store.close()
+    assert store.counters["writes"] == 1
+    reopened = SQLiteSessionStore(path, flush_seconds=60)
+    try:
+        assert reopened.load("abc") == {**STATE, "page": "summary"}
+        assert reopened.load("missing") is None
+    finally:
+        reopened.close()
+
+
+def test_flusher_thread_writes_in_the_background(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), flush_seconds=0.01)
+    try:
+        store.save("abc", STATE)
+        deadline = time.monotonic() + 2
+        while store.stats()["sessions"] == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert store.stats()["sessions"] == 1
+    finally:
+        store.close()
+
+
+def test_purge_on_another_worker_does_not_lose_blobs(tmp_path):
+    path = str(tmp_path / "sessions.db")
+    first = SQLiteSessionStore(path, flush_seconds=60)
+    second = SQLiteSessionStore(path, flush_seconds=60)
+    try:
+        first.save("old", STATE)
+        first.flush()
+        second.purge(-1)  # drops "old" and the resume blob nobody references any more
+        first.save("new", {**STATE, "user_id": "new"})
+        first.flush()
+        assert second.load("new")["resume_text"] == STATE["resume_text"]
+    finally:
+        first.close()
+        second.close()
+
+
+def test_delete(tmp_path):
+    store = SQLiteSessionStore(str(tmp_path / "sessions.db"), flush_seconds=60)
+    try:
+        store.save("abc", STATE)
+        store.flush()
+        store.delete("abc")
+        assert store.load("abc") is None
+    finally:
+        store.close()